@@ -8,12 +8,21 @@
 #
 
 
+import bisect
 import json
 import os
+import sys
 import time
+from collections import OrderedDict
 from PySide6 import QtWidgets, QtCore, QtGui
 from pymxs import runtime as rt
 
+# The evaluation engine lives next to this script; make it importable when run via Scripting > Run Script
+try: SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+except NameError: SCRIPT_DIR = os.getcwd()
+if SCRIPT_DIR not in sys.path: sys.path.insert(0, SCRIPT_DIR)
+from scenelinter_core import COLLECTION_CONDITION_TYPES, CHANGE_EVENTS, FULL_RELINT_EVENTS, BatchEvaluator, OffenderSet, RuleStore, RunProfile, apply_fixes, compiled_rule, export_offenders, load_compiled_rules, load_rules, read_history, rule_dependencies
+
 # --- PLACEHOLDERS: PLEASE FILL IN YOUR INFORMATION HERE ---
 AUTHOR_NAME = "Iman Shirani"
 GITHUB_LINK = "https://github.com/imanshirani/SceneLinter-Pro"
@@ -32,14 +41,102 @@ PRESET_PROPERTIES = {
     "Render Width": "renderWidth", "Render Height": "renderHeight", "Number of Lights": "lights.count",
     "Total Scene Polygons": "polycount.total", "Render Output Path": "rendOutputFilename"
 }
-# Constants for tree item types
-FOLDER_ITEM_TYPE = 1001
-RULE_ITEM_TYPE = 1002
+# Classes whose property lists are indexed up front, so their properties are searchable without a selection,
+# with the path that reaches an instance from the selected node
+COMMON_PROPERTY_CLASSES = {
+    "Editable_Poly": "$.{}", "Editable_mesh": "$.{}", "Box": "$.{}", "Plane": "$.{}", "TargetCamera": "$.{}", "FreeCamera": "$.{}", "Physical_Camera": "$.{}",
+    "Omnilight": "$.{}", "TargetDirectionallight": "$.{}", "TurboSmooth": "$.modifiers[#TurboSmooth].{}", "Shell": "$.modifiers[#Shell].{}", "PhysicalMaterial": "$.material.{}"
+}
+# Libraries with more rules than this open collapsed; folders then load their rows only when expanded
+AUTO_EXPAND_RULE_LIMIT = 200
 
-# --- HELPER FUNCTION ---
+# --- HELPER FUNCTIONS ---
 def get_max_main_window():
     try: from shiboken6 import wrapInstance; return wrapInstance(int(rt.windows.getMAXHWND()), QtWidgets.QWidget)
     except: return None
+def rule_status(result): return "Timed Out" if result.timed_out else "Passed" if result.is_valid else "Failed"
+
+def fuzzy_score(query, candidate):
+    """Ranks how well `query` matches `candidate` (both lowercase): 0 prefix, 1 substring,
+    2+ for an in-order subsequence (more gaps rank lower), None for no match."""
+    if candidate.startswith(query): return 0
+    if query in candidate: return 1
+    position = -1; gaps = 0
+    for char in query:
+        found = candidate.find(char, position + 1)
+        if found == -1: return None
+        gaps += found - position - 1; position = found
+    return 2 + gaps
+
+# --- PROPERTY INDEX ---
+class PropertyIndex(QtCore.QObject):
+    """Searchable index of MaxScript properties for the Rule Editor. Property names are cached per
+    (source, class), so every renderer or object class is only queried once per session. The index is
+    filled a source at a time from the event loop and picks up a new renderer the next time it is searched."""
+    SOURCES = [("Render Settings", lambda: rt.renderers.current, "renderers.current.{}"), ("Viewport", lambda: rt.viewport, "viewport.{}"),
+               ("Global Lights", lambda: rt.lights, "lights.{}"), ("Global Geometry", lambda: rt.geometry, "geometry.{}")]
+    def __init__(self, parent=None):
+        super().__init__(parent); self._class_props = {}; self._source_entries = {}; self._sorted_entries = None; self._renderer_class = None; self._selection_key = None; self._queue = []
+        self.timer = QtCore.QTimer(self); self.timer.setInterval(0); self.timer.timeout.connect(self._build_step)
+    def build(self):
+        """Starts indexing the global sources and common classes in the background."""
+        self._queue = [("source", source) for source in self.SOURCES] + [("class", item) for item in COMMON_PROPERTY_CLASSES.items()]; self.timer.start()
+    def _build_step(self):
+        if not self._queue: self.timer.stop(); return
+        kind, job = self._queue.pop(0)
+        if kind == "source": friendly_name, getter, prop_format = job; self._index_object(friendly_name, getter(), prop_format)
+        else:
+            class_name, prop_format = job; max_class = getattr(rt, class_name, None)
+            if max_class is not None: self._index_object(f"[{class_name}]", max_class, prop_format, class_key=f"{class_name} class")
+    def _properties(self, target_obj, prop_format, class_key=None):
+        key = (prop_format, class_key or str(rt.classOf(target_obj)))
+        if key not in self._class_props:
+            names = set()
+            try: names.update(str(name) for name in rt.getPropNames(target_obj))
+            except Exception: pass
+            try: names.update(name for name in dir(target_obj) if not name.startswith('__'))
+            except Exception: pass
+            self._class_props[key] = sorted(names)
+        return self._class_props[key]
+    def _index_object(self, friendly_name, target_obj, prop_format, class_key=None, slot=None):
+        try: props = self._properties(target_obj, prop_format, class_key)
+        except Exception: return
+        self._source_entries[slot or friendly_name] = [(prop.lower(), f"{friendly_name} -> .{prop}", prop_format.format(prop)) for prop in props]; self._sorted_entries = None
+    def refresh(self):
+        """Re-indexes the renderer if it changed and adds the current selection. Both are cached per class."""
+        # A search before the background build finishes completes it first
+        while self._queue: self._build_step()
+        self.timer.stop(); renderer_class = str(rt.classOf(rt.renderers.current))
+        if renderer_class != self._renderer_class:
+            friendly_name, getter, prop_format = self.SOURCES[0]; self._renderer_class = renderer_class; self._index_object(friendly_name, getter(), prop_format)
+        selection_key = None
+        if rt.selection.count > 0:
+            selected_obj = rt.selection[0]; selection_key = (str(selected_obj.name), str(rt.classOf(selected_obj)))
+            if selection_key != self._selection_key: self._index_object(f"[Selection] {selection_key[0]}", selected_obj, "$.{}", slot="[Selection]")
+        elif self._source_entries.pop("[Selection]", None) is not None: self._sorted_entries = None
+        self._selection_key = selection_key
+    def search(self, query, limit=50):
+        """Returns up to `limit` (display_text, final_string) pairs ranked by fuzzy_score.
+        Dotted queries such as 'renderers.current.gi' are matched against the full MaxScript path."""
+        query = query.strip().lower()
+        if not query: return []
+        if self._sorted_entries is None: self._sorted_entries = sorted(entry for entries in self._source_entries.values() for entry in entries)
+        if "." not in query:
+            # Prefix hits come straight from the sorted index; only the rest needs a scan
+            start = bisect.bisect_left(self._sorted_entries, (query,)); ranked = []
+            for entry in self._sorted_entries[start:]:
+                if not entry[0].startswith(query) or len(ranked) >= limit: break
+                ranked.append((0, len(entry[0]), entry))
+            if len(ranked) < limit: ranked += [(score, len(entry[0]), entry) for entry in self._sorted_entries if not entry[0].startswith(query) and (score := fuzzy_score(query, entry[0])) is not None]
+        else: ranked = [(score, len(entry[2]), entry) for entry in self._sorted_entries if (score := fuzzy_score(query, entry[2].lower())) is not None]
+        ranked.sort(key=lambda match: (match[0], match[1], match[2][0]))
+        return [(entry[1], entry[2]) for _, _, entry in ranked[:limit]]
+
+property_index_instance = None
+def get_property_index():
+    global property_index_instance
+    if property_index_instance is None: property_index_instance = PropertyIndex()
+    return property_index_instance
 
 # --- UI DIALOGS (AboutDialog and RuleEditorDialog) ---
 class AboutDialog(QtWidgets.QDialog):
@@ -56,71 +153,366 @@ class AboutDialog(QtWidgets.QDialog):
 class RuleEditorDialog(QtWidgets.QDialog):
     # ... (This class is complete and correct)
     def __init__(self, parent=None, rule_data=None):
-        super().__init__(parent); self.setWindowTitle("Rule Editor"); self.setMinimumWidth(450); self.rule_data = {}
+        super().__init__(parent); self.setWindowTitle("Rule Editor"); self.setMinimumWidth(450); self.rule_data = {}; self.condition = {}
         self.main_layout = QtWidgets.QVBoxLayout(self); self.form_layout = QtWidgets.QFormLayout(); self.name_edit = QtWidgets.QLineEdit(); self.error_msg_edit = QtWidgets.QLineEdit(); self.value_edit = QtWidgets.QLineEdit(); self.fix_script_edit = QtWidgets.QLineEdit()
-        self.type_combo = QtWidgets.QComboBox(); self.type_combo.addItems(["property_not_empty", "min_value", "max_value", "property_equals", "collection_property_all_match"])
+        self.type_combo = QtWidgets.QComboBox(); self.type_combo.addItems(["property_not_empty", "min_value", "max_value", "property_equals"] + list(COLLECTION_CONDITION_TYPES))
         prop_layout = QtWidgets.QHBoxLayout(); self.prop_combo = QtWidgets.QComboBox(); self.prop_combo.setEditable(True)
         self.prop_combo.addItems([""] + sorted(PRESET_PROPERTIES.keys())); self.search_btn = QtWidgets.QPushButton("Search...")
         prop_layout.addWidget(self.prop_combo); prop_layout.addWidget(self.search_btn)
         self.form_layout.addRow("Rule Name:", self.name_edit); self.form_layout.addRow("Condition Type:", self.type_combo); self.form_layout.addRow("MaxScript Target/Prop:", prop_layout); self.form_layout.addRow("Expected Value:", self.value_edit); self.form_layout.addRow("Error Message:", self.error_msg_edit); self.form_layout.addRow("Auto-Fix Script:", self.fix_script_edit)
         self.button_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel); self.button_box.accepted.connect(self._on_accept); self.button_box.rejected.connect(self.reject)
         self.search_btn.clicked.connect(self._search_properties); self.main_layout.addLayout(self.form_layout); self.main_layout.addWidget(self.button_box)
+        # Search-as-you-type against the cached property index, debounced so fast typing doesn't query per keystroke
+        self.prop_completer = QtWidgets.QCompleter(QtCore.QStringListModel(self), self); self.prop_completer.setCompletionMode(QtWidgets.QCompleter.CompletionMode.UnfilteredPopupCompletion); self.prop_combo.setCompleter(self.prop_completer)
+        self.completion_timer = QtCore.QTimer(self); self.completion_timer.setSingleShot(True); self.completion_timer.setInterval(150); self.completion_timer.timeout.connect(self._update_completions)
+        self.prop_combo.lineEdit().textEdited.connect(lambda text: self.completion_timer.start())
         if rule_data: self._populate_fields(rule_data)
+    def _update_completions(self):
+        text = self.prop_combo.lineEdit().text()
+        if text in PRESET_PROPERTIES or len(text.strip()) < 2: return
+        try: get_property_index().refresh(); matches = get_property_index().search(text, 30)
+        except Exception as e: print(f"SceneLinter: Property search failed: {e}"); return
+        self.prop_completer.model().setStringList([final_string for _, final_string in matches])
+        if matches: self.prop_completer.complete()
     def _search_properties(self):
         search_term = self.prop_combo.currentText().lower()
         if not search_term: QtWidgets.QMessageBox.information(self, "Search", "Please type a search term."); return
-        found_props = []; search_targets = [("Render Settings", rt.renderers.current, "renderers.current.{}"), ("Viewport", rt.viewport, "viewport.{}"), ("Global Lights", rt.lights, "lights.{}"), ("Global Geometry", rt.geometry, "geometry.{}")]
-        if rt.selection.count > 0: selected_obj = rt.selection[0]; search_targets.insert(0, (f"[Selection] {selected_obj.name}", selected_obj, "$.{}"))
-        for friendly_name, target_obj, prop_format in search_targets:
-            try:
-                all_props = dir(target_obj)
-                for prop in all_props:
-                    if search_term in prop.lower() and not prop.startswith('__'): display_text = f"{friendly_name} -> .{prop}"; final_string = prop_format.format(prop); found_props.append((display_text, final_string))
-            except Exception: continue
-        if not found_props: QtWidgets.QMessageBox.information(self, "Search Results", f"No properties found containing '{search_term}'."); return
+        try: get_property_index().refresh(); found_props = get_property_index().search(search_term, 500)
+        except Exception as e: print(f"SceneLinter: Property search failed: {e}"); found_props = []
+        if not found_props: QtWidgets.QMessageBox.information(self, "Search Results", f"No properties found matching '{search_term}'."); return
         dialog = QtWidgets.QDialog(self); dialog.setWindowTitle("Search Results"); dialog.setMinimumWidth(350); layout = QtWidgets.QVBoxLayout(dialog); list_widget = QtWidgets.QListWidget()
-        for display_text, final_string in sorted(found_props):
+        for display_text, final_string in found_props:
             item = QtWidgets.QListWidgetItem(display_text); item.setData(QtCore.Qt.UserRole, final_string); list_widget.addItem(item)
         layout.addWidget(list_widget); list_widget.itemDoubleClicked.connect(dialog.accept)
         if dialog.exec() == QtWidgets.QDialog.Accepted and list_widget.currentItem():
             selected_item = list_widget.currentItem(); full_prop_string = selected_item.data(QtCore.Qt.UserRole); self.prop_combo.setCurrentText(full_prop_string)
     def _populate_fields(self, data):
-        self.name_edit.setText(data.get("name", "")); self.error_msg_edit.setText(data.get("error_message", "")); self.fix_script_edit.setText(data.get("fix_script", "")); condition = data.get("condition", {})
+        self.name_edit.setText(data.get("name", "")); self.error_msg_edit.setText(data.get("error_message", "")); self.fix_script_edit.setText(data.get("fix_script", "")); condition = data.get("condition", {}); self.condition = dict(condition)
         prop_value = condition.get("maxscript_property", ""); friendly_name = prop_value
         for name, command in PRESET_PROPERTIES.items():
             if command == prop_value: friendly_name = name; break
         self.prop_combo.setCurrentText(friendly_name); self.value_edit.setText(str(condition.get("value", ""))); index = self.type_combo.findText(condition.get("type", "")); self.type_combo.setCurrentIndex(index if index != -1 else 0)
     def _on_accept(self):
         prop_text = self.prop_combo.currentText(); maxscript_command = PRESET_PROPERTIES.get(prop_text, prop_text)
-        self.rule_data = { "name": self.name_edit.text(), "enabled": True, "condition": { "type": self.type_combo.currentText(), "maxscript_property": maxscript_command, "value": self.value_edit.text() }, "error_message": self.error_msg_edit.text(), "fix_script": self.fix_script_edit.text() }
+        # Keys the editor has no field for (such as a collection rule's "limit") are kept from the original condition
+        condition = dict(self.condition, type=self.type_combo.currentText(), maxscript_property=maxscript_command, value=self.value_edit.text())
+        self.rule_data = { "name": self.name_edit.text(), "enabled": True, "condition": condition, "error_message": self.error_msg_edit.text(), "fix_script": self.fix_script_edit.text() }
         self.accept()
     def get_data(self): return self.rule_data
+class OffenderListModel(QtCore.QAbstractListModel):
+    """Virtual list over an OffenderSet. Names are fetched a page at a time as rows scroll into view and only the
+    most recently used pages are kept, so the list stays fast with any number of offenders."""
+    PAGE_SIZE = 500
+    MAX_PAGES = 20
+    def __init__(self, offenders, parent=None): super().__init__(parent); self.offenders = offenders; self._pages = OrderedDict()
+    def rowCount(self, parent=QtCore.QModelIndex()): return 0 if parent.isValid() else self.offenders.count
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or role != QtCore.Qt.DisplayRole: return None
+        number, offset = divmod(index.row(), self.PAGE_SIZE); page = self._page(number)
+        return page[offset] if offset < len(page) else ""
+    def _page(self, number):
+        if number in self._pages: self._pages.move_to_end(number)
+        else:
+            self._pages[number] = self.offenders.names(number * self.PAGE_SIZE, self.PAGE_SIZE)
+            if len(self._pages) > self.MAX_PAGES: self._pages.popitem(last=False)
+        return self._pages[number]
+class OffenderDialog(QtWidgets.QDialog):
+    """Pages through every offender of a failed collection rule, selects them in the scene in batches and exports the full list."""
+    def __init__(self, offenders, parent=None):
+        super().__init__(parent); self.offenders = offenders; self.batch = -1; self.setWindowTitle(f"Offenders - {offenders.rule.name}"); self.setMinimumSize(420, 480)
+        layout = QtWidgets.QVBoxLayout(self); self.count_label = QtWidgets.QLabel(f"<b>{offenders.count}</b> object(s) currently fail this rule.")
+        self.list_view = QtWidgets.QListView(); self.list_view.setUniformItemSizes(True); self.list_view.setModel(OffenderListModel(offenders, self)); self.list_view.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.ExtendedSelection)
+        batch_layout = QtWidgets.QHBoxLayout(); self.batch_spin = QtWidgets.QSpinBox(); self.batch_spin.setRange(1, 100000); self.batch_spin.setSingleStep(500); self.batch_spin.setValue(1000)
+        self.prev_batch_btn = QtWidgets.QPushButton("< Previous Batch"); self.next_batch_btn = QtWidgets.QPushButton("Select Next Batch >")
+        batch_layout.addWidget(QtWidgets.QLabel("Batch Size:")); batch_layout.addWidget(self.batch_spin); batch_layout.addStretch(); batch_layout.addWidget(self.prev_batch_btn); batch_layout.addWidget(self.next_batch_btn)
+        self.selection_label = QtWidgets.QLabel("")
+        bottom_layout = QtWidgets.QHBoxLayout(); self.select_highlighted_btn = QtWidgets.QPushButton("Select Highlighted"); self.export_btn = QtWidgets.QPushButton("Export..."); self.close_btn = QtWidgets.QPushButton("Close")
+        bottom_layout.addWidget(self.select_highlighted_btn); bottom_layout.addStretch(); bottom_layout.addWidget(self.export_btn); bottom_layout.addWidget(self.close_btn)
+        layout.addWidget(self.count_label); layout.addWidget(self.list_view); layout.addLayout(batch_layout); layout.addWidget(self.selection_label); layout.addLayout(bottom_layout)
+        self.prev_batch_btn.clicked.connect(lambda: self._select_batch(-1)); self.next_batch_btn.clicked.connect(lambda: self._select_batch(1))
+        self.select_highlighted_btn.clicked.connect(self._select_highlighted); self.export_btn.clicked.connect(self._export); self.close_btn.clicked.connect(self.accept)
+    def _select_batch(self, step):
+        size = self.batch_spin.value(); last_batch = max(0, (self.offenders.count - 1) // size); self.batch = min(max(self.batch + step, 0), last_batch)
+        start = self.batch * size; end = min(start + size, self.offenders.count)
+        try: selected = self.offenders.select(range(start, end))
+        except Exception as e: self.selection_label.setText(f"Could not select: {e}"); return
+        self.selection_label.setText(f"Selected {start + 1}-{end} of {self.offenders.count} ({selected} node(s))."); self.list_view.scrollTo(self.list_view.model().index(start, 0), QtWidgets.QAbstractItemView.ScrollHint.PositionAtTop)
+    def _select_highlighted(self):
+        rows = [index.row() for index in self.list_view.selectionModel().selectedRows()]
+        try: selected = self.offenders.select(rows)
+        except Exception as e: self.selection_label.setText(f"Could not select: {e}"); return
+        self.selection_label.setText(f"Selected {selected} of {len(rows)} highlighted object(s).")
+    def _export(self):
+        file_path, selected_filter = QtWidgets.QFileDialog.getSaveFileName(self, "Export Offenders", "", "CSV Files (*.csv);;JSON Files (*.json)")
+        if not file_path: return
+        file_format = "json" if file_path.lower().endswith(".json") or (not file_path.lower().endswith(".csv") and "json" in selected_filter.lower()) else "csv"
+        try: written = export_offenders(self.offenders, file_path, file_format); print(f"SceneLinter: Exported {written} offender(s) to {file_path}")
+        except Exception as e: print(f"SceneLinter: Error exporting offenders: {e}")
+    def done(self, result):
+        self.offenders.release(); super().done(result)
 
 
+# --- RULE TREE MODEL ---
+class RuleTreeModel(QtCore.QAbstractItemModel):
+    """Qt model over a RuleStore. A folder's children are only exposed once the view asks for them
+    (fetchMore), so collapsed folders of a large library cost nothing to display."""
+    HEADERS = ["Enabled", "Rule / Folder Name", "Condition Type", "Status", "Time"]
+    MIME_TYPE = "application/x-scenelinter-rules"
+    STATUS_COLORS = {"Passed": "#4CAF50", "Failed": "#E53935", "Timed Out": "#FB8C00", "Invalid": "#8E24AA"}
+    edited = QtCore.Signal() # any change that should mark the rules file as dirty
+    rules_enabled = QtCore.Signal(list) # rule records that were just switched on
+    def __init__(self, parent=None):
+        super().__init__(parent); self.store = RuleStore(); self._fetched = set(); self._dragged = []; self._folder_font = QtGui.QFont("Segoe UI", 9, QtGui.QFont.Weight.Bold)
+    def set_store(self, store):
+        self.beginResetModel(); self.store = store; self._fetched = set(); self._dragged = []; self.endResetModel()
+    def record(self, index): return index.internalPointer() if index.isValid() else self.store.root
+    def index_of(self, record, column=0):
+        return QtCore.QModelIndex() if record is None or record is self.store.root else self.createIndex(record.row, column, record)
+    # --- QAbstractItemModel interface ---
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        if not self.hasIndex(row, column, parent): return QtCore.QModelIndex()
+        return self.createIndex(row, column, self.record(parent).children[row])
+    def parent(self, index):
+        return self.index_of(index.internalPointer().parent) if index.isValid() else QtCore.QModelIndex()
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.column() > 0: return 0
+        folder = self.record(parent)
+        return len(folder.children) if folder.is_folder and (folder is self.store.root or folder in self._fetched) else 0
+    def columnCount(self, parent=QtCore.QModelIndex()): return len(self.HEADERS)
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        folder = self.record(parent); return parent.column() <= 0 and folder.is_folder and bool(folder.children)
+    def canFetchMore(self, parent):
+        folder = self.record(parent); return folder.is_folder and folder is not self.store.root and folder not in self._fetched and bool(folder.children)
+    def fetchMore(self, parent):
+        folder = self.record(parent)
+        if not self.canFetchMore(parent): return
+        self.beginInsertRows(parent, 0, len(folder.children) - 1); self._fetched.add(folder); self.endInsertRows()
+    def fetch_all(self, folder=None):
+        """Exposes every folder's children, e.g. before filtering or expanding the whole tree."""
+        for child in (folder or self.store.root).children:
+            if child.is_folder: self.fetchMore(self.index_of(child)); self.fetch_all(child)
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole: return self.HEADERS[section]
+        return None
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid(): return None
+        record = index.internalPointer(); column = index.column()
+        if role == QtCore.Qt.DisplayRole:
+            if column == 1: return record.name
+            if column == 2: return "Folder" if record.is_folder else record.condition.get("type", "N/A")
+            if column == 3 and not record.is_folder: return record.status or ""
+            if column == 4 and record.elapsed_ms is not None and (record.elapsed_ms or not record.is_folder): return f"{record.elapsed_ms:.1f} ms"
+        elif role == QtCore.Qt.CheckStateRole and column == 0: return QtCore.Qt.CheckState.Checked if record.enabled else QtCore.Qt.CheckState.Unchecked
+        elif role == QtCore.Qt.FontRole and column == 1 and record.is_folder: return self._folder_font
+        elif role == QtCore.Qt.ForegroundRole and column == 3 and not record.is_folder and record.status: return QtGui.QBrush(QtGui.QColor(self.STATUS_COLORS.get(record.status, "#9E9E9E")))
+        elif role == QtCore.Qt.ToolTipRole and column == 3 and not record.is_folder and record.message: return record.message
+        return None
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        if not index.isValid() or index.column() != 0 or role != QtCore.Qt.CheckStateRole: return False
+        record = index.internalPointer(); enabled = QtCore.Qt.CheckState(value) == QtCore.Qt.CheckState.Checked
+        # Folders cascade their state to everything inside them
+        self._set_enabled(record, enabled, True); self.edited.emit()
+        if enabled: self.rules_enabled.emit(self.store.enabled_rules(record) if record.is_folder else [record])
+        return True
+    def _set_enabled(self, record, enabled, notify):
+        record.enabled = enabled
+        if notify: index = self.index_of(record); self.dataChanged.emit(index, index, [QtCore.Qt.CheckStateRole])
+        if record.is_folder:
+            for child in record.children: self._set_enabled(child, enabled, notify and record in self._fetched)
+    def flags(self, index):
+        if not index.isValid(): return QtCore.Qt.ItemFlag.ItemIsDropEnabled
+        flags = QtCore.Qt.ItemFlag.ItemIsEnabled | QtCore.Qt.ItemFlag.ItemIsSelectable | QtCore.Qt.ItemFlag.ItemIsDragEnabled
+        if index.column() == 0: flags |= QtCore.Qt.ItemFlag.ItemIsUserCheckable
+        if index.internalPointer().is_folder: flags |= QtCore.Qt.ItemFlag.ItemIsDropEnabled
+        return flags
+    # --- Drag & drop: the view drops serialized copies, then removes the originals via removeRows ---
+    def supportedDropActions(self): return QtCore.Qt.DropAction.MoveAction
+    def mimeTypes(self): return [self.MIME_TYPE]
+    def mimeData(self, indexes):
+        self._dragged = self.top_level_records([self.record(index) for index in indexes if index.column() == 0])
+        mime = QtCore.QMimeData(); mime.setData(self.MIME_TYPE, QtCore.QByteArray(json.dumps([record.to_dict() for record in self._dragged]).encode("utf-8"))); return mime
+    def canDropMimeData(self, data, action, row, column, parent):
+        target = self.record(parent)
+        return data.hasFormat(self.MIME_TYPE) and target.is_folder and not any(self._contains(dragged, target) for dragged in self._dragged)
+    def dropMimeData(self, data, action, row, column, parent):
+        if action == QtCore.Qt.DropAction.IgnoreAction: return True
+        if not self.canDropMimeData(data, action, row, column, parent): return False
+        target = self.record(parent); items_data = json.loads(bytes(data.data(self.MIME_TYPE)).decode("utf-8"))
+        self.insert_records(target, len(target.children) if row < 0 else row, [self.store.record_from_dict(item_data, target) for item_data in items_data]); return True
+    def removeRows(self, row, count, parent=QtCore.QModelIndex()):
+        self.beginRemoveRows(parent, row, row + count - 1); self.store.remove(self.record(parent), row, count); self.endRemoveRows(); self.edited.emit(); return True
+    @staticmethod
+    def _contains(folder, record):
+        while record is not None:
+            if record is folder: return True
+            record = record.parent
+        return False
+    def top_level_records(self, records):
+        """Drops records whose folder is also in the list, so a folder and its contents are handled once."""
+        unique = list({id(record): record for record in records}.values())
+        return [record for record in unique if not any(other is not record and other.is_folder and self._contains(other, record) for other in unique)]
+    # --- Edits ---
+    def insert_records(self, folder, row, records):
+        if folder is not self.store.root and folder not in self._fetched:
+            if folder.children: self.fetchMore(self.index_of(folder))
+            else: self._fetched.add(folder)
+        self.beginInsertRows(self.index_of(folder), row, row + len(records) - 1); self.store.insert(folder, row, records); self.endInsertRows(); self.edited.emit()
+    def remove_record(self, record): self.removeRows(record.row, 1, self.index_of(record.parent))
+    def update_rule(self, record, rule_data): self.store.update_rule(record, rule_data); self._notify_row(record); self.edited.emit()
+    def rename_folder(self, record, name): record.name = name; self._notify_row(record); self.edited.emit()
+    def set_status(self, record, status, message, elapsed_ms=None):
+        record.status = status; record.message = message
+        if elapsed_ms is not None: record.elapsed_ms = elapsed_ms
+        self._notify_row(record, 3, 4)
+    def clear_times(self, records):
+        for record in records: record.elapsed_ms = None; self._notify_row(record, 4, 4)
+    def update_folder_times(self, folder=None):
+        """Sets every folder's time to the sum of the rules inside it; returns the total for `folder`."""
+        total = 0.0
+        for child in (folder or self.store.root).children:
+            child_ms = self.update_folder_times(child) if child.is_folder else (child.elapsed_ms or 0.0)
+            if child.is_folder: child.elapsed_ms = child_ms; self._notify_row(child, 4, 4)
+            total += child_ms
+        return total
+    def _notify_row(self, record, first=0, last=4):
+        # Only rows the view knows about get a signal; records in unfetched folders or already removed are skipped
+        node = record
+        while node is not self.store.root:
+            parent = node.parent
+            if parent is None or node.row >= len(parent.children) or parent.children[node.row] is not node: return
+            if parent is not self.store.root and parent not in self._fetched: return
+            node = parent
+        self.dataChanged.emit(self.index_of(record, first), self.index_of(record, last))
+
+class RuleFilterProxyModel(QtCore.QSortFilterProxyModel):
+    """Filters the rule tree by a case-insensitive match on rule names and MaxScript targets; folders
+    stay visible while anything inside them matches."""
+    def __init__(self, parent=None):
+        super().__init__(parent); self.text = ""; self.setRecursiveFilteringEnabled(True)
+    def set_filter_text(self, text):
+        self.text = text.strip().lower()
+        if self.text: self.sourceModel().fetch_all()
+        self.invalidateFilter()
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self.text: return True
+        record = self.sourceModel().record(source_parent).children[source_row]
+        return self.text in record.name.lower() or (not record.is_folder and self.text in str(record.condition.get("maxscript_property", "")).lower())
+
+class LiveLinter(QtCore.QObject):
+    """Keeps the Status column current while artists work. Scene callbacks only mark the rules
+    that depend on the reported kind of change as dirty; a debounced pass re-checks them through its own
+    CheckRunner, so live passes are sliced and honour the Rule Timeout like a manual run."""
+    CALLBACK_ID = "SceneLinterProLive"
+    def __init__(self, ui, debounce_ms=750):
+        super().__init__(ui); self.ui = ui; self.active = False; self.dirty_kinds = set(); self.dirty_records = []; self.full_pass = False
+        self.timer = QtCore.QTimer(self); self.timer.setSingleShot(True); self.timer.setInterval(debounce_ms); self.timer.timeout.connect(self._run_pass)
+        self.runner = CheckRunner(self, quiet=True); self.runner.rule_finished.connect(ui._set_record_status)
+    def start(self):
+        if self.active: return
+        callback_id = rt.name(self.CALLBACK_ID)
+        for kind, events in CHANGE_EVENTS.items():
+            for event in events: self._add_callback(event, lambda *args, kind=kind: self.mark_kind_dirty(kind), callback_id)
+        for event in FULL_RELINT_EVENTS: self._add_callback(event, lambda *args: self.mark_all_dirty(), callback_id)
+        self.active = True; self.mark_all_dirty(); print("SceneLinter: Live linting started.")
+    def stop(self):
+        if not self.active: return
+        try: rt.callbacks.removeScripts(id=rt.name(self.CALLBACK_ID))
+        except Exception as e: print(f"SceneLinter: Error removing live callbacks: {e}")
+        self.timer.stop(); self.runner.cancel(); self.active = False; self.dirty_kinds.clear(); self.dirty_records = []; print("SceneLinter: Live linting stopped.")
+    def _add_callback(self, event, handler, callback_id):
+        # Not every notification exists in every 3ds Max version; skip the ones this build doesn't know.
+        try: rt.callbacks.addScript(rt.name(event), handler, id=callback_id)
+        except Exception as e: print(f"SceneLinter: Live callback #{event} unavailable: {e}")
+    def mark_kind_dirty(self, kind):
+        if self.active: self.dirty_kinds.add(kind); self.timer.start()
+    def mark_records_dirty(self, records):
+        if self.active: self.dirty_records.extend(records); self.timer.start()
+    def mark_all_dirty(self):
+        if self.active: self.runner.cancel(); self.full_pass = True; self.timer.start() # a full pass supersedes the one in progress
+    def _run_pass(self):
+        # Changes made while a pass (live or manual) is running are picked up once it ends
+        if self.runner.running or self.ui.check_runner.running: self.timer.start(); return
+        records = self.ui.rule_model.store.enabled_rules()
+        if not self.full_pass:
+            dirty_ids = {id(record) for record in self.dirty_records}
+            records = [record for record in records if id(record) in dirty_ids or rule_dependencies(record) & self.dirty_kinds]
+        self.dirty_kinds.clear(); self.dirty_records = []; self.full_pass = False
+        if records: self.runner.start(records, self.ui.timeout_spin.value() or None)
+
+class CheckRunner(QtCore.QObject):
+    """Runs checks in short slices from the Qt event loop so 3ds Max stays responsive and the run can be
+    cancelled. Slice size adapts to stay near slice_ms; each slice is still evaluated as one batch."""
+    rule_finished = QtCore.Signal(object, object, float) # record, RuleResult, elapsed_ms
+    progress = QtCore.Signal(int, int) # done, total
+    finished = QtCore.Signal(list, bool) # failed rules info, cancelled
+    def __init__(self, parent=None, slice_ms=50, quiet=False):
+        super().__init__(parent); self.slice_ms = slice_ms; self.quiet = quiet; self.running = False
+        self.timer = QtCore.QTimer(self); self.timer.setInterval(0); self.timer.timeout.connect(self._run_slice)
+    def start(self, rules, timeout_ms=None, stop_on_failure=False):
+        self.rules = rules; self.position = 0; self.slice_size = 1
+        self.failed_rules_info = []; self.stop_on_failure = stop_on_failure; self.evaluator = BatchEvaluator(timeout_ms=timeout_ms); self.profile = RunProfile()
+        self.running = True; self.progress.emit(0, len(rules)); self.timer.start()
+    def cancel(self):
+        if not self.running: return
+        if not self.quiet: print("SceneLinter: Checks cancelled.")
+        self._finish(True)
+    def _run_slice(self):
+        end = min(self.position + self.slice_size, len(self.rules)); start_time = time.perf_counter()
+        results = self.evaluator.evaluate(self.rules[self.position:end]); elapsed_ms = (time.perf_counter() - start_time) * 1000.0
+        statuses = [rule_status(result) for result in results]
+        self.profile.add_batch(start_time, self.evaluator, [record.path() for record in self.rules[self.position:end]], statuses)
+        if elapsed_ms < self.slice_ms / 2: self.slice_size *= 2
+        elif elapsed_ms > self.slice_ms: self.slice_size = max(1, self.slice_size // 2)
+        for result, rule_ms in zip(results, self.evaluator.last_elapsed_ms):
+            record = self.rules[self.position]; self.position += 1
+            self.rule_finished.emit(record, result, rule_ms)
+            if not result.is_valid:
+                self.failed_rules_info.append({"record": record, "message": result.message, "fix_script": record.fix_script})
+                if self.stop_on_failure: break
+        self.progress.emit(self.position, len(self.rules))
+        if self.position >= len(self.rules) or (self.stop_on_failure and self.failed_rules_info): self._finish(False)
+    def _finish(self, cancelled):
+        self.timer.stop(); self.running = False
+        if not self.quiet: print("SceneLinter: Expression cache - {hits} hits, {misses} misses, {entries} distinct expressions".format(**self.evaluator.cache.stats()))
+        self.finished.emit(self.failed_rules_info, cancelled)
+
 class SceneLinterProUI(QtWidgets.QWidget):
     def __init__(self, parent=None):
         # ... (init logic is the same)
-        super().__init__(parent); self.current_file_path = None; self.is_dirty = False; self.init_ui(); self.connect_signals()
+        super().__init__(parent); self.current_file_path = None; self.is_dirty = False; self.failed_rules_info = []; self.carried_failures = []; self.full_run = True; self.check_runner = CheckRunner(self); self.init_ui(); self.connect_signals()
         self.error_dialog = QtWidgets.QMessageBox(self); self.error_dialog.setWindowModality(QtCore.Qt.NonModal)
         self.error_dialog.setWindowTitle("Check Failed"); self.error_dialog.setIcon(QtWidgets.QMessageBox.Warning)
-        QtCore.QTimer.singleShot(0, self.load_rules_startup)
+        QtCore.QTimer.singleShot(0, self.load_rules_startup); QtCore.QTimer.singleShot(0, get_property_index().build)
 
     def init_ui(self):
         # ... (init_ui is the same)
-        main_layout = QtWidgets.QVBoxLayout(self); self.rules_tree = QtWidgets.QTreeWidget(); self.rules_tree.setColumnCount(3)
-        self.rules_tree.setHeaderLabels(["Enabled", "Rule / Folder Name", "Condition Type"]); self.rules_tree.setColumnWidth(0, 60)
+        main_layout = QtWidgets.QVBoxLayout(self); self.rule_model = RuleTreeModel(self); self.filter_model = RuleFilterProxyModel(self); self.filter_model.setSourceModel(self.rule_model)
+        self.rules_tree = QtWidgets.QTreeView(); self.rules_tree.setModel(self.filter_model); self.rules_tree.setUniformRowHeights(True); self.rules_tree.setColumnWidth(0, 60)
         self.rules_tree.header().setSectionResizeMode(1, QtWidgets.QHeaderView.ResizeMode.Stretch); self.rules_tree.setAlternatingRowColors(True)
         self.rules_tree.setDragDropMode(QtWidgets.QAbstractItemView.DragDropMode.InternalMove); self.rules_tree.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.rules_tree.setDragEnabled(True); self.rules_tree.setAcceptDrops(True); self.rules_tree.setDropIndicatorShown(True)
         self.rules_tree.setStyleSheet("QTreeView::item { min-height: 24px; }")
+        self.filter_edit = QtWidgets.QLineEdit(); self.filter_edit.setPlaceholderText("Filter rules by name or MaxScript target..."); self.filter_edit.setClearButtonEnabled(True)
+        self.filter_timer = QtCore.QTimer(self); self.filter_timer.setSingleShot(True); self.filter_timer.setInterval(200)
         buttons_layout = QtWidgets.QHBoxLayout(); self.add_rule_btn = QtWidgets.QPushButton("Add Rule"); self.add_folder_btn = QtWidgets.QPushButton("Add Folder")
         self.edit_btn = QtWidgets.QPushButton("Edit"); self.delete_btn = QtWidgets.QPushButton("Delete")
         buttons_layout.addWidget(self.add_rule_btn); buttons_layout.addWidget(self.add_folder_btn); buttons_layout.addWidget(self.edit_btn); buttons_layout.addWidget(self.delete_btn); buttons_layout.addStretch()
         file_actions_layout = QtWidgets.QHBoxLayout(); self.load_btn = QtWidgets.QPushButton("Load Rules..."); self.save_btn = QtWidgets.QPushButton("Save Rules As...")
-        file_actions_layout.addStretch(); file_actions_layout.addWidget(self.load_btn); file_actions_layout.addWidget(self.save_btn)
+        self.export_trace_btn = QtWidgets.QPushButton("Export Trace..."); self.export_trace_btn.setToolTip("Save the last run's rule timings as Chrome trace-event JSON."); self.export_trace_btn.setEnabled(False)
+        file_actions_layout.addWidget(self.export_trace_btn); file_actions_layout.addStretch(); file_actions_layout.addWidget(self.load_btn); file_actions_layout.addWidget(self.save_btn)
         main_actions_layout = QtWidgets.QHBoxLayout(); self.run_check_btn = QtWidgets.QPushButton("Run Checks & Render")
         self.run_check_btn.setStyleSheet("background-color: #4CAF50; color: white; padding: 5px; border-radius: 3px;")
-        main_actions_layout.addStretch(); main_actions_layout.addWidget(self.run_check_btn)
-        main_layout.addWidget(QtWidgets.QLabel("<h3>Linter Rules</h3>")); main_layout.addLayout(buttons_layout); main_layout.addWidget(self.rules_tree); main_layout.addLayout(file_actions_layout); main_layout.addLayout(main_actions_layout)
+        self.live_check = QtWidgets.QCheckBox("Live Lint"); self.live_check.setToolTip("Re-check affected rules automatically as the scene changes."); self.live_linter = LiveLinter(self)
+        self.timeout_spin = QtWidgets.QSpinBox(); self.timeout_spin.setRange(0, 600000); self.timeout_spin.setSingleStep(1000); self.timeout_spin.setValue(10000); self.timeout_spin.setSuffix(" ms"); self.timeout_spin.setSpecialValueText("No limit")
+        self.timeout_spin.setToolTip("Rules that run longer than this are marked as timed out. Collection rules stop scanning once the limit is reached.")
+        self.stop_on_failure_check = QtWidgets.QCheckBox("Stop at first failure")
+        main_actions_layout.addWidget(self.live_check); main_actions_layout.addWidget(QtWidgets.QLabel("Rule Timeout:")); main_actions_layout.addWidget(self.timeout_spin); main_actions_layout.addWidget(self.stop_on_failure_check); main_actions_layout.addStretch(); main_actions_layout.addWidget(self.run_check_btn)
+        progress_layout = QtWidgets.QHBoxLayout(); self.progress_bar = QtWidgets.QProgressBar(); self.cancel_btn = QtWidgets.QPushButton("Cancel")
+        progress_layout.addWidget(self.progress_bar); progress_layout.addWidget(self.cancel_btn); self.progress_bar.hide(); self.cancel_btn.hide()
+        results_layout = QtWidgets.QHBoxLayout(); self.summary_label = QtWidgets.QLabel(""); self.fix_all_btn = QtWidgets.QPushButton("Attempt to Fix All"); self.fix_all_btn.setEnabled(False)
+        self.offenders_btn = QtWidgets.QPushButton("Show Offenders..."); self.offenders_btn.setToolTip("Browse, select and export every object that fails the current collection rule."); self.offenders_btn.setEnabled(False)
+        results_layout.addWidget(self.summary_label, 1); results_layout.addWidget(self.offenders_btn); results_layout.addWidget(self.fix_all_btn)
+        main_layout.addWidget(QtWidgets.QLabel("<h3>Linter Rules</h3>")); main_layout.addLayout(buttons_layout); main_layout.addWidget(self.filter_edit); main_layout.addWidget(self.rules_tree); main_layout.addLayout(file_actions_layout); main_layout.addLayout(main_actions_layout); main_layout.addLayout(progress_layout); main_layout.addLayout(results_layout)
 
     def connect_signals(self):
         # ... (other connections are the same)
@@ -128,92 +520,63 @@ class SceneLinterProUI(QtWidgets.QWidget):
         self.edit_btn.clicked.connect(self.edit_selected_item)
         self.delete_btn.clicked.connect(self.delete_selected_item)
         self.load_btn.clicked.connect(self.load_rules_from); self.save_btn.clicked.connect(self.save_rules_as)
-        self.run_check_btn.clicked.connect(self.run_checks)
-        self.rules_tree.itemDoubleClicked.connect(self.edit_selected_item)
+        self.run_check_btn.clicked.connect(self.run_checks); self.cancel_btn.clicked.connect(self.check_runner.cancel)
+        self.fix_all_btn.clicked.connect(lambda: self._run_fixes(self.failed_rules_info)); self.export_trace_btn.clicked.connect(self.export_trace)
+        self.check_runner.rule_finished.connect(self._set_record_status); self.check_runner.progress.connect(self._on_check_progress); self.check_runner.finished.connect(self._on_checks_finished)
+        self.live_check.toggled.connect(lambda checked: self.live_linter.start() if checked else self.live_linter.stop())
+        self.rules_tree.doubleClicked.connect(self._on_double_clicked); self.rules_tree.selectionModel().currentChanged.connect(self._update_offenders_button); self.offenders_btn.clicked.connect(self.show_offenders)
+        self.filter_edit.textChanged.connect(self.filter_timer.start); self.filter_timer.timeout.connect(self._apply_filter)
+        self.rule_model.edited.connect(self.set_dirty); self.rule_model.rules_enabled.connect(self.live_linter.mark_records_dirty)
 
-        # --- MODIFIED: Connect to a dedicated handler function ---
-        self.rules_tree.itemChanged.connect(self._handle_item_changed)
-
-    # --- NEW: Handler for checkbox changes and cascading logic ---
-    def _handle_item_changed(self, item, column):
-        """Handles changes to items, specifically for cascading checkboxes."""
-        # Only act on changes in the 'Enabled' column
-        if column == 0:
-            # Block signals to prevent infinite loops while we change children
-            self.rules_tree.blockSignals(True)
-            try:
-                # If the changed item is a folder, cascade the change to its children
-                if item.type() == FOLDER_ITEM_TYPE:
-                    new_state = item.checkState(0)
-                    self._set_children_check_state(item, new_state)
-            finally:
-                # Always unblock signals
-                self.rules_tree.blockSignals(False)
-            
-            # Mark the file as dirty since a change was made
-            self.set_dirty(True)
-
-    def _set_children_check_state(self, parent_item, state):
-        """Recursively sets the check state for all children of a given item."""
-        for i in range(parent_item.childCount()):
-            child = parent_item.child(i)
-            child.setCheckState(0, state)
-            # If the child is also a folder, continue the cascade
-            if child.type() == FOLDER_ITEM_TYPE:
-                self._set_children_check_state(child, state)
-    
-    # --- ALL OTHER METHODS in this class remain the same ---
+    def _apply_filter(self):
+        text = self.filter_edit.text(); self.filter_model.set_filter_text(text)
+        if text.strip(): self.rules_tree.expandAll()
+    def _record_at(self, proxy_index): return self.rule_model.record(self.filter_model.mapToSource(proxy_index))
+    def _current_record(self):
+        index = self.rules_tree.currentIndex(); return self._record_at(index) if index.isValid() else None
+    def _selected_records(self):
+        return self.rule_model.top_level_records([self._record_at(index) for index in self.rules_tree.selectionModel().selectedRows(0)])
+    def _target_folder(self):
+        record = self._current_record(); return record if record is not None and record.is_folder else self.rule_model.store.root
+    def _add_record(self, record_data):
+        folder = self._target_folder(); record = self.rule_model.store.record_from_dict(record_data, folder)
+        self.rule_model.insert_records(folder, len(folder.children), [record])
+        if folder is not self.rule_model.store.root: self.rules_tree.expand(self.filter_model.mapFromSource(self.rule_model.index_of(folder)))
+        return record
     def set_dirty(self, dirty_state=True): self.is_dirty = dirty_state
     def add_new_rule(self):
         dialog = RuleEditorDialog(self)
         if dialog.exec() == QtWidgets.QDialog.Accepted:
-            rule_data = dialog.get_data(); rule_data["type"] = "rule"; self._create_tree_item(rule_data); self.set_dirty()
+            rule_data = dialog.get_data(); rule_data["type"] = "rule"; record = self._add_record(rule_data); self._mark_invalid_rules([record]); self.live_linter.mark_records_dirty([record])
     def add_new_folder(self):
         folder_name, ok = QtWidgets.QInputDialog.getText(self, "Create Folder", "Enter folder name:")
-        if ok and folder_name:
-            folder_data = {"type": "folder", "name": folder_name, "enabled": True, "children": []}; self._create_tree_item(folder_data); self.set_dirty()
-    def _create_tree_item(self, item_data, parent_item=None):
-        if parent_item is None:
-            selected_item = self.rules_tree.currentItem()
-            if selected_item and selected_item.type() == FOLDER_ITEM_TYPE: parent_item = selected_item
-            else: parent_item = self.rules_tree.invisibleRootItem()
-        tree_item = QtWidgets.QTreeWidgetItem(parent_item, type=RULE_ITEM_TYPE if item_data["type"] == "rule" else FOLDER_ITEM_TYPE)
-        self._update_tree_item(tree_item, item_data); return tree_item
-    def edit_selected_item(self, item=None, column=None):
-        selected_item = item or self.rules_tree.currentItem()
-        if not selected_item: return
-        if column is not None and column != 1: return
-        item_data = selected_item.data(1, QtCore.Qt.UserRole)
-        if selected_item.type() == FOLDER_ITEM_TYPE:
-            new_name, ok = QtWidgets.QInputDialog.getText(self, "Edit Folder Name", "Enter new name:", text=item_data.get("name", ""))
-            if ok and new_name: item_data["name"] = new_name; self._update_tree_item(selected_item, item_data); self.set_dirty()
-        elif selected_item.type() == RULE_ITEM_TYPE:
-            dialog = RuleEditorDialog(self, rule_data=item_data)
+        if ok and folder_name: self._add_record({"type": "folder", "name": folder_name, "enabled": True, "children": []})
+    def _on_double_clicked(self, index):
+        if index.column() == 1: self.edit_selected_item()
+        elif index.column() == 3: self.show_offenders()
+    def edit_selected_item(self):
+        record = self._current_record()
+        if record is None: return
+        if record.is_folder:
+            new_name, ok = QtWidgets.QInputDialog.getText(self, "Edit Folder Name", "Enter new name:", text=record.name)
+            if ok and new_name: self.rule_model.rename_folder(record, new_name)
+        else:
+            dialog = RuleEditorDialog(self, rule_data=record.to_dict())
             if dialog.exec() == QtWidgets.QDialog.Accepted:
-                updated_data = dialog.get_data(); updated_data["type"] = "rule"; self._update_tree_item(selected_item, updated_data); self.set_dirty()
+                updated_data = dialog.get_data(); updated_data["type"] = "rule"; self.rule_model.update_rule(record, updated_data); self._mark_invalid_rules([record]); self.live_linter.mark_records_dirty([record])
     def delete_selected_item(self):
-        selected_items = self.rules_tree.selectedItems()
-        if not selected_items: return
-        for item in selected_items: (item.parent() or self.rules_tree.invisibleRootItem()).removeChild(item)
-        self.set_dirty()
+        # Remove bottom-up so the row numbers of the remaining selected records stay valid
+        for record in sorted(self._selected_records(), key=lambda record: record.row, reverse=True): self.rule_model.remove_record(record)
     def save_rules_as(self):
         file_path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Save Rules File", "", "JSON Files (*.json)");
         if not file_path: return False
-        data_to_save = self._tree_to_dict(self.rules_tree.invisibleRootItem())
+        data_to_save = self.rule_model.store.to_data()
         try:
             with open(file_path, 'w', encoding='utf-8') as f: json.dump(data_to_save, f, indent=4)
             print(f"SceneLinter: Saved rules to {file_path}"); self.set_dirty(False)
             if self.parentWidget(): self.parentWidget().setWindowTitle(f"SceneLinter Pro - {os.path.basename(file_path)}")
             return True
         except Exception as e: print(f"SceneLinter: Error saving file: {e}"); return False
-    def _tree_to_dict(self, parent_item):
-        data = []
-        for i in range(parent_item.childCount()):
-            child_item = parent_item.child(i); item_data = child_item.data(1, QtCore.Qt.UserRole)
-            item_data["enabled"] = (child_item.checkState(0) == QtCore.Qt.CheckState.Checked)
-            if child_item.type() == FOLDER_ITEM_TYPE: item_data["children"] = self._tree_to_dict(child_item)
-            data.append(item_data)
-        return data
     def load_rules_from(self):
         file_path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Load Rules File", "", "JSON Files (*.json)");
         if not file_path: return
@@ -221,43 +584,73 @@ class SceneLinterProUI(QtWidgets.QWidget):
     def _read_rules_from_file(self, file_path):
         self.current_file_path = file_path
         try:
-            with open(file_path, 'r', encoding='utf-8') as f: data = json.load(f)
-            self.rules_tree.clear(); self._populate_tree(data, self.rules_tree.invisibleRootItem())
-            print(f"SceneLinter: Loaded rules from {file_path}"); self.set_dirty(False)
+            store = RuleStore.from_data(load_rules(file_path)); compiled = load_compiled_rules(file_path); compiled.define_functions(rt)
+            # Both lists are in tree order, disabled rules included
+            for record, rule in zip((record for record in store.iter_records() if not record.is_folder), compiled.rules): record.compiled = rule
+            self.rule_model.set_store(store); self.filter_model.set_filter_text(self.filter_edit.text())
+            if store.rule_count() <= AUTO_EXPAND_RULE_LIMIT: self.rules_tree.expandAll()
+            invalid = self._mark_invalid_rules(record for record in store.iter_records() if not record.is_folder)
+            self.summary_label.setText(f"{len(invalid)} rule(s) could not be compiled. Hover their status for details." if invalid else "")
+            print(f"SceneLinter: Loaded rules from {file_path}"); self.set_dirty(False); self.live_linter.mark_all_dirty()
             if self.parentWidget(): self.parentWidget().setWindowTitle(f"SceneLinter Pro - {os.path.basename(file_path)}")
         except Exception as e: print(f"SceneLinter: Error loading file: {e}")
-    def _populate_tree(self, items_data, parent_qt_item):
-        for item_data in items_data:
-            item_type = FOLDER_ITEM_TYPE if item_data.get("type") == "folder" else RULE_ITEM_TYPE
-            tree_item = QtWidgets.QTreeWidgetItem(parent_qt_item, type=item_type)
-            self._update_tree_item(tree_item, item_data)
-            if item_type == FOLDER_ITEM_TYPE:
-                children = item_data.get("children", []); self._populate_tree(children, tree_item); tree_item.setExpanded(True)
-    def _update_tree_item(self, item, data):
-        item.setFlags(item.flags() | QtCore.Qt.ItemFlag.ItemIsUserCheckable); is_enabled = data.get("enabled", True)
-        item.setCheckState(0, QtCore.Qt.CheckState.Checked if is_enabled else QtCore.Qt.CheckState.Unchecked)
-        item.setText(1, data.get("name", "Unnamed")); item.setData(1, QtCore.Qt.UserRole, data)
-        if item.type() == FOLDER_ITEM_TYPE:
-            item.setFont(1, QtGui.QFont("Segoe UI", 9, QtGui.QFont.Weight.Bold)); item.setText(2, "Folder")
-        else: item.setText(2, data.get("condition", {}).get("type", "N/A"))
+    def _mark_invalid_rules(self, records):
+        """Flags rules whose schema or MaxScript target did not compile, so they are caught before a render."""
+        invalid = [record for record in records if compiled_rule(record).error]
+        for record in invalid: record.result = None; self.rule_model.set_status(record, "Invalid", record.compiled.error); print(f"SceneLinter: Invalid rule '{' / '.join(record.path())}': {record.compiled.error}")
+        return invalid
     def run_checks(self):
-        print("SceneLinter: Starting checks..."); failed_rules_info = []
-        self._traverse_tree_for_checks(self.rules_tree.invisibleRootItem(), failed_rules_info)
-        if not failed_rules_info: QtWidgets.QMessageBox.information(self, "Success", "All checks passed!")
-        else:
-            error_messages = [f"- {info['message']}" for info in failed_rules_info]; error_string = "The following scene checks failed:\n\n" + "\n".join(error_messages)
-            msg_box = QtWidgets.QMessageBox(self); msg_box.setWindowTitle("Check Failed"); msg_box.setText(error_string); msg_box.setIcon(QtWidgets.QMessageBox.Warning)
-            ok_button = msg_box.addButton("OK", QtWidgets.QMessageBox.ButtonRole.AcceptRole); fix_button = msg_box.addButton("Attempt to Fix All", QtWidgets.QMessageBox.ButtonRole.ActionRole)
-            msg_box.exec();
-            if msg_box.clickedButton() == fix_button: self._run_fixes(failed_rules_info)
-    def _traverse_tree_for_checks(self, parent_item, failed_list):
-        for i in range(parent_item.childCount()):
-            child_item = parent_item.child(i)
-            if child_item.checkState(0) == QtCore.Qt.CheckState.Checked:
-                if child_item.type() == RULE_ITEM_TYPE:
-                    rule_data = child_item.data(1, QtCore.Qt.UserRole); is_valid, msg = self._evaluate_rule(rule_data)
-                    if not is_valid: failed_list.append({"message": msg, "fix_script": rule_data.get("fix_script", "")})
-                elif child_item.type() == FOLDER_ITEM_TYPE: self._traverse_tree_for_checks(child_item, failed_list)
+        if self.check_runner.running: return
+        print("SceneLinter: Starting checks..."); self._start_run(self.rule_model.store.enabled_rules())
+    def _start_run(self, records, carried_failures=(), full_run=True):
+        """Runs `records`; failures in carried_failures (rules not re-run this time) are kept in the results."""
+        self.rule_model.clear_times(records); self.carried_failures = list(carried_failures); self.full_run = full_run
+        self.failed_rules_info = []; self.fix_all_btn.setEnabled(False); self.summary_label.setText("Running checks..."); self._set_running(True)
+        self.check_runner.start(records, self.timeout_spin.value() or None, self.stop_on_failure_check.isChecked() and full_run)
+    def _set_running(self, running):
+        """Shows the progress row and locks tree edits while the runner still holds references to rule records."""
+        for widget in (self.run_check_btn, self.add_rule_btn, self.add_folder_btn, self.edit_btn, self.delete_btn, self.load_btn): widget.setEnabled(not running)
+        self.progress_bar.setVisible(running); self.cancel_btn.setVisible(running); self.rules_tree.setDragEnabled(not running)
+    def _on_check_progress(self, done, total): self.progress_bar.setMaximum(max(total, 1)); self.progress_bar.setValue(done)
+    def _on_checks_finished(self, failed_rules_info, cancelled):
+        failed_rules_info = self.carried_failures + failed_rules_info; self.carried_failures = []
+        self._set_running(False); self.failed_rules_info = failed_rules_info; done = self.check_runner.position; total = len(self.check_runner.rules)
+        for info in failed_rules_info: print(f"  - {info['message']}")
+        if cancelled: summary = f"Cancelled after {done} of {total} rules, {len(failed_rules_info)} failed."
+        elif not failed_rules_info: summary = "All checks passed!"
+        else: summary = f"{len(failed_rules_info)} check(s) failed" + (f", stopped after {done} of {total} rules" if done < total else "") + ". Hover a status for details."
+        self.summary_label.setText(summary); self.fix_all_btn.setEnabled(any(info.get("fix_script") for info in failed_rules_info))
+        self.rule_model.update_folder_times(); self._report_profile(self.check_runner.profile, record_history=self.full_run and not cancelled)
+    def _report_profile(self, profile, record_history=True):
+        slowest = [rule for rule in profile.slowest(10) if rule["elapsed_ms"] > 0]; self.export_trace_btn.setEnabled(bool(profile.rules))
+        if not slowest: return
+        lines = [f"{rule['elapsed_ms']:8.1f} ms  {' / '.join(rule['path'])}" for rule in slowest]; print("SceneLinter: Slowest rules:\n" + "\n".join(lines))
+        self.summary_label.setText(self.summary_label.text() + f" Slowest: {slowest[0]['path'][-1]} ({slowest[0]['elapsed_ms']:.0f} ms)."); self.summary_label.setToolTip("Slowest rules:\n" + "\n".join(lines))
+        history_path = self.get_profile_history_path()
+        if not record_history or not history_path: return
+        try:
+            for path, current_ms, median_ms in profile.find_regressions(read_history(history_path)): print(f"SceneLinter: Possible regression: '{path}' took {current_ms:.1f} ms (usually {median_ms:.1f} ms)")
+            profile.append_to_history(history_path)
+        except Exception as e: print(f"SceneLinter: Error updating profile history: {e}")
+    def get_profile_history_path(self):
+        rules_path = self.get_default_rules_path()
+        return os.path.join(os.path.dirname(rules_path), "profile_history.jsonl") if rules_path else None
+    def export_trace(self):
+        file_path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export Chrome Trace", "", "Trace Files (*.json)")
+        if not file_path: return
+        try: self.check_runner.profile.export_chrome_trace(file_path); print(f"SceneLinter: Exported trace to {file_path}")
+        except Exception as e: print(f"SceneLinter: Error exporting trace: {e}")
+    def _set_record_status(self, record, result, elapsed_ms=None):
+        record.result = result; self.rule_model.set_status(record, rule_status(result), result.message, elapsed_ms)
+        if record is self._current_record(): self._update_offenders_button()
+    def _update_offenders_button(self, *args):
+        record = self._current_record(); self.offenders_btn.setEnabled(record is not None and not record.is_folder and record.result is not None and record.result.has_offenders)
+    def show_offenders(self):
+        record = self._current_record()
+        if record is None or record.is_folder or record.result is None or not record.result.has_offenders: return
+        try: offenders = OffenderSet(rt, record.result.rule)
+        except Exception as e: print(f"SceneLinter: Error collecting offenders: {e}"); return
+        OffenderDialog(offenders, self).exec()
     def get_default_rules_path(self, tool_name="SceneLinterPro"):
         try:
             user_scripts_path = rt.pathConfig.GetDir(rt.name("userScripts")); settings_folder = os.path.join(user_scripts_path, tool_name)
@@ -267,40 +660,20 @@ class SceneLinterProUI(QtWidgets.QWidget):
         default_path = self.get_default_rules_path();
         if default_path and os.path.exists(default_path): self._read_rules_from_file(default_path); self.set_dirty(False)
     def _run_fixes(self, failed_rules_info):
-        print("SceneLinter: Attempting to run fixes...");
-        for info in failed_rules_info:
-            fix_script = info.get("fix_script")
-            if fix_script:
-                try: rt.execute(fix_script); print(f"  > Executed fix: {fix_script}")
-                except Exception as e: print(f"  > FAILED to execute fix: {fix_script}. Error: {e}")
-        QtWidgets.QMessageBox.information(self, "Fix Attempted", "Fixes have been applied. Please run checks again to verify.")
-    def _evaluate_rule(self, rule_data):
-        condition = rule_data.get("condition", {}); cond_type = condition.get("type"); target_string = condition.get("maxscript_property"); expected_value_str = condition.get("value"); error_msg = rule_data.get("error_message", "A rule failed.")
-        if cond_type == "collection_property_all_match":
-            collection_str = target_string; property_to_check = expected_value_str
-            try:
-                collection = rt.execute(collection_str); mismatched_objects = []
-                for item in collection:
-                    if rt.getProperty(item, property_to_check) == False: mismatched_objects.append(item.name)
-                if mismatched_objects: error = f"{error_msg}: {', '.join(mismatched_objects)}"; return (False, error)
-            except Exception as e: return (False, f"Error evaluating collection rule: {e}")
-        else:
-            if not target_string: return (False, f"Rule '{rule_data.get('name')}' has an empty target.")
-            try: actual_value = rt.execute(target_string)
-            except Exception as e: return (False, f"Error evaluating '{target_string}': {e}")
-            if cond_type == "property_not_empty":
-                if actual_value is None or str(actual_value).strip() == "": return (False, error_msg)
-            elif cond_type == "min_value":
-                try:
-                    if float(actual_value) < float(expected_value_str): return (False, f"{error_msg} (Value: {actual_value}, Min: {expected_value_str})")
-                except: return (False, "Invalid number in min_value rule.")
-            elif cond_type == "max_value":
-                try:
-                    if float(actual_value) > float(expected_value_str): return (False, f"{error_msg} (Value: {actual_value}, Max: {expected_value_str})")
-                except: return (False, "Invalid number in max_value rule.")
-            elif cond_type == "property_equals":
-                if str(actual_value).lower() != str(expected_value_str).lower(): return (False, f"{error_msg} (Value: {actual_value}, Expected: {expected_value_str})")
-        return (True, "Passed")
+        """Applies every failed rule's fix as one undo step with redraw off, then re-checks only the rules that were fixed."""
+        if self.check_runner.running: return
+        print("SceneLinter: Attempting to run fixes...")
+        try: results = {result["fix_script"]: result for result in apply_fixes(rt, [info.get("fix_script") for info in failed_rules_info])}
+        except Exception as e: print(f"SceneLinter: Error running fixes: {e}"); QtWidgets.QMessageBox.warning(self, "Fix Failed", f"The fixes could not be run:\n{e}"); return
+        for result in results.values():
+            if result["ok"]: print(f"  > Fixed in {result['elapsed_ms']:.1f} ms: {result['fix_script']}")
+            else: print(f"  > FAILED after {result['elapsed_ms']:.1f} ms: {result['fix_script']}. Error: {result['error']}")
+        fixed = [info for info in failed_rules_info if results.get(info.get("fix_script"), {}).get("ok")]
+        not_fixed = [info for info in failed_rules_info if info not in fixed]; failed_fixes = [result for result in results.values() if not result["ok"]]
+        if failed_fixes: QtWidgets.QMessageBox.warning(self, "Some Fixes Failed", "\n".join(f"{result['fix_script']}\n    {result['error']}" for result in failed_fixes))
+        total_ms = sum(result["elapsed_ms"] for result in results.values())
+        print(f"SceneLinter: Applied {len(results) - len(failed_fixes)} of {len(results)} fixes in {total_ms:.1f} ms as one undo step.")
+        if fixed: self._start_run([info["record"] for info in fixed], not_fixed, full_run=False)
         
 # --- MainWindow and Main Execution ---
 class MainWindow(QtWidgets.QMainWindow):
@@ -325,6 +698,8 @@ class MainWindow(QtWidgets.QMainWindow):
             elif reply == QtWidgets.QMessageBox.StandardButton.Discard: event.accept()
             else: event.ignore()
         else: event.accept()
+        # Scene callbacks outlive the window, so always unregister them once it closes
+        if event.isAccepted(): self.ui_instance.live_linter.stop(); self.ui_instance.check_runner.cancel()
 
 main_window_instance = None
 def main():
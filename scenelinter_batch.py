@@ -0,0 +1,113 @@
+#
+#   SceneLinter Pro - Batch Linter
+#   Lints many .max scenes from the command line (e.g. before a farm
+#   submit), spreading them across a pool of worker processes that each
+#   own their own MaxScript runtime.
+#
+#   Usage:
+#       python scenelinter_batch.py rules.json shots/ --jobs 8 --format junit -o report.xml
+#       python scenelinter_batch.py rules.json a.max b.max --runtime my_stub:make_runtime
+#
+#   The default runtime is pymxs, so without --runtime this must run under
+#   3ds Max's own Python interpreter.
+#
+
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+from xml.sax.saxutils import quoteattr
+from scenelinter_core import lint_scene, load_compiled_rules, resolve_runtime_factory
+
+DEFAULT_RUNTIME = "scenelinter_core:pymxs_runtime"
+
+# --- WORKER PROCESS ---
+# Each worker builds its runtime once in the pool initializer and reuses it for every scene it is handed.
+_worker_runtime = None
+_worker_rules = None
+_worker_error = None
+
+def create_runtime(runtime_spec):
+    """Builds a runtime from a 'module:callable' spec, raising RuntimeError with a readable message if that fails."""
+    try: return resolve_runtime_factory(runtime_spec)()
+    except Exception as e: raise RuntimeError(f"Could not create runtime '{runtime_spec}': {e}") from e
+
+def _init_worker(runtime_spec, rules):
+    # An exception here makes the pool respawn the worker forever, so it is kept and reported for each scene instead
+    global _worker_runtime, _worker_rules, _worker_error
+    _worker_rules = rules
+    try: _worker_runtime = create_runtime(runtime_spec)
+    except RuntimeError as e: _worker_error = str(e)
+
+def _lint_in_worker(scene_path):
+    if _worker_error: return {"scene": scene_path, "passed": False, "error": _worker_error, "duration": 0.0, "rules": []}
+    return lint_scene(_worker_runtime, scene_path, _worker_rules)
+
+# --- OUTPUT WRITERS ---
+class JsonLinesWriter:
+    """Writes one JSON object per scene as soon as it finishes."""
+    def __init__(self, stream): self.stream = stream
+    def write(self, result): self.stream.write(json.dumps(result) + "\n"); self.stream.flush()
+    def close(self): pass
+
+class JUnitWriter:
+    """Streams a JUnit XML report with one <testsuite> per scene and one <testcase> per rule."""
+    def __init__(self, stream):
+        self.stream = stream; self.stream.write('<?xml version="1.0" encoding="UTF-8"?>\n<testsuites name="SceneLinter Pro">\n')
+    def write(self, result):
+        scene = quoteattr(result["scene"]); rules = result["rules"]; failures = sum(1 for rule in rules if not rule["passed"]); errors = 1 if result["error"] else 0
+        lines = [f'  <testsuite name={scene} tests="{len(rules) + errors}" failures="{failures}" errors="{errors}" time="{result["duration"]}">']
+        if result["error"]: lines.append(f'    <testcase classname={scene} name="Open scene"><error message={quoteattr(result["error"])}/></testcase>')
+        for rule in rules:
+            if rule["passed"]: lines.append(f'    <testcase classname={scene} name={quoteattr(rule["name"])}/>')
+            else: lines.append(f'    <testcase classname={scene} name={quoteattr(rule["name"])}><failure message={quoteattr(rule["message"])}/></testcase>')
+        lines.append("  </testsuite>\n"); self.stream.write("\n".join(lines)); self.stream.flush()
+    def close(self): self.stream.write("</testsuites>\n"); self.stream.flush()
+
+WRITERS = {"jsonl": JsonLinesWriter, "junit": JUnitWriter}
+
+# --- BATCH RUN ---
+def find_scenes(paths):
+    """Expands directories into the .max files they contain (recursively), keeping explicit files as given."""
+    scenes = []
+    for path in paths:
+        if not os.path.isdir(path): scenes.append(path); continue
+        for root, _, files in os.walk(path): scenes.extend(os.path.join(root, name) for name in sorted(files) if name.lower().endswith(".max"))
+    return scenes
+
+def run_batch(rules_path, scene_paths, writer, jobs=None, runtime_spec=DEFAULT_RUNTIME):
+    """Lints every scene in a process pool and streams the results to `writer`. Returns the number of scenes that did not pass.
+    Workers that cannot create their runtime report it as each scene's error."""
+    compiled = load_compiled_rules(rules_path); rules = compiled.enabled_rules(); not_passed = 0
+    # Schema errors are known before any scene is opened; those rules still fail in every scene's report
+    for rule in compiled.errors(): print(f"SceneLinter: Invalid rule '{' / '.join(rule.path)}': {rule.error}", file=sys.stderr)
+    with multiprocessing.Pool(jobs, initializer=_init_worker, initargs=(runtime_spec, rules)) as pool:
+        for result in pool.imap_unordered(_lint_in_worker, scene_paths):
+            writer.write(result); not_passed += 0 if result["passed"] else 1
+    writer.close(); return not_passed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lint 3ds Max scenes with a SceneLinter Pro rules file.")
+    parser.add_argument("rules", help="Rules .json file saved from SceneLinter Pro.")
+    parser.add_argument("scenes", nargs="+", help=".max files or directories to search for .max files.")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Number of worker processes (default: CPU count).")
+    parser.add_argument("-f", "--format", choices=sorted(WRITERS), default="jsonl", help="Output format (default: jsonl).")
+    parser.add_argument("-o", "--output", help="Write the report to this file instead of stdout.")
+    parser.add_argument("--runtime", default=DEFAULT_RUNTIME, help=f"'module:callable' factory returning the MaxScript runtime each worker uses (default: {DEFAULT_RUNTIME}).")
+    args = parser.parse_args(argv)
+    scene_paths = find_scenes(args.scenes)
+    if not scene_paths: print("SceneLinter: No scenes found.", file=sys.stderr); return 2
+    # Fail here, before any output or worker exists, rather than once per scene
+    try: create_runtime(args.runtime)
+    except RuntimeError as e: print(f"SceneLinter: {e}", file=sys.stderr); return 2
+    stream = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try: not_passed = run_batch(args.rules, scene_paths, WRITERS[args.format](stream), args.jobs, args.runtime)
+    finally:
+        if args.output: stream.close()
+    print(f"SceneLinter: {len(scene_paths) - not_passed}/{len(scene_paths)} scenes passed.", file=sys.stderr)
+    return 1 if not_passed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+#
+#   SceneLinter Pro - Benchmarks
+#   Measures rule evaluation outside 3ds Max: each rule suite runs through
+#   BatchEvaluator against the scene simulator (scenelinter_sim.py) at
+#   several scene sizes, and rules/sec, bridge calls per run and peak
+#   memory are compared with a stored baseline.
+#
+#   Usage:
+#       python scenelinter_bench.py                          # all suites at 1k/100k/1M nodes
+#       python scenelinter_bench.py --nodes 1000 --latency-ms 1.0
+#       python scenelinter_bench.py --property renderable=bool:0.9
+#       python scenelinter_bench.py --save-baseline          # record this machine's numbers
+#
+#   Exits with 1 when a result is worse than the baseline by more than
+#   --tolerance. Timings are machine-specific: record a baseline on the
+#   machine that will compare against it.
+#
+#   Author: Iman Shirani
+#
+
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from scenelinter_core import BatchEvaluator, collect_enabled_rules, compile_rule, load_rules
+from scenelinter_sim import SimulatedRuntime, SimulatedScene
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RULES_PATH = os.path.join(BENCH_DIR, "default_rules.json")
+COOKBOOK_RULES_PATH = os.path.join(BENCH_DIR, "cookbook_rules.json") # the Complete and Advanced examples from COOKBOOK.md
+DEFAULT_BASELINE_PATH = os.path.join(BENCH_DIR, "benchmark_baseline.json")
+DEFAULT_SIZES = (1000, 100000, 1000000)
+DEFAULT_LATENCY_MS = 0.2 # fixed cost of one pymxs execute() round-trip
+DEFAULT_MARSHAL_US = 0.5 # cost per value converted on the way back to Python
+DEFAULT_TOLERANCE = 0.25
+
+# --- RULE SUITES ---
+def load_suites(rules_path=DEFAULT_RULES_PATH, cookbook_path=COOKBOOK_RULES_PATH):
+    """Returns {suite name: list of rule dicts}."""
+    return {"default": collect_enabled_rules(load_rules(rules_path)), "cookbook": collect_enabled_rules(load_rules(cookbook_path))}
+
+# --- MEASUREMENT ---
+def run_benchmark(rules, nodes, runs=3, latency_ms=DEFAULT_LATENCY_MS, marshal_us=DEFAULT_MARSHAL_US, properties=None, seed=1):
+    """Evaluates `rules` `runs` times against a fresh simulated scene of `nodes` nodes, then once more under tracemalloc.
+    The first run also defines the target functions, so it is reported apart from the steady-state median."""
+    compiled = [compile_rule(rule) for rule in rules]; runtime = SimulatedRuntime(SimulatedScene(nodes, properties, seed), latency_ms, marshal_us)
+    durations = []; bridge_calls = []; bridge_seconds = []
+    for _ in range(max(1, runs)):
+        evaluator = BatchEvaluator(runtime); bridge_start = runtime.bridge_seconds; start = time.perf_counter()
+        results = evaluator.evaluate(compiled)
+        durations.append(time.perf_counter() - start); bridge_calls.append(evaluator.bridge_calls); bridge_seconds.append(runtime.bridge_seconds - bridge_start)
+    failures = [f"{rule.name}: {result.message}" for rule, result in zip(compiled, results) if result.message.startswith("Error")]
+    # Memory is measured in its own run because tracemalloc slows everything it traces; scene columns already exist by now
+    tracemalloc.start()
+    try: BatchEvaluator(runtime).evaluate(compiled); peak = tracemalloc.get_traced_memory()[1]
+    finally: tracemalloc.stop()
+    steady = durations[1:] or durations; steady_bridge = bridge_seconds[1:] or bridge_seconds; median = statistics.median(steady)
+    return {"nodes": nodes, "rules": len(compiled), "runs": len(durations), "first_run_ms": round(durations[0] * 1000, 2), "median_ms": round(median * 1000, 2),
+            "rules_per_sec": round(len(compiled) / median, 2) if median else 0.0, "bridge_ms": round(statistics.median(steady_bridge) * 1000, 2),
+            "first_run_bridge_calls": bridge_calls[0], "bridge_calls": bridge_calls[-1], "peak_mb": round(peak / (1024 * 1024), 3), "errors": failures}
+
+# --- BASELINES ---
+def baseline_key(suite, nodes): return f"{suite}@{nodes}"
+
+def read_baseline(path):
+    if not os.path.exists(path): return {}
+    with open(path, 'r', encoding='utf-8') as f: return json.load(f).get("results", {})
+
+def write_baseline(path, results, settings):
+    with open(path, 'w', encoding='utf-8') as f: json.dump({"settings": settings, "results": results}, f, indent=4, sort_keys=True); f.write("\n")
+
+def compare(result, baseline, tolerance):
+    """Returns the regressions of one result against its baseline entry, as readable strings.
+    Bridge calls are deterministic and must not grow; timing and memory may move within `tolerance`."""
+    if not baseline: return []
+    regressions = []
+    if result["rules_per_sec"] < baseline["rules_per_sec"] * (1 - tolerance): regressions.append(f"rules/sec {result['rules_per_sec']} < {baseline['rules_per_sec']}")
+    if result["bridge_calls"] > baseline["bridge_calls"]: regressions.append(f"bridge calls {result['bridge_calls']} > {baseline['bridge_calls']}")
+    if result["first_run_bridge_calls"] > baseline["first_run_bridge_calls"]: regressions.append(f"first-run bridge calls {result['first_run_bridge_calls']} > {baseline['first_run_bridge_calls']}")
+    if result["peak_mb"] > baseline["peak_mb"] * (1 + tolerance) and result["peak_mb"] - baseline["peak_mb"] > 0.1: regressions.append(f"peak memory {result['peak_mb']} MB > {baseline['peak_mb']} MB")
+    return regressions
+
+# --- COMMAND LINE ---
+def parse_property(text):
+    """Parses NAME=bool:P, NAME=uniform:LOW:HIGH or NAME=choice:V1/V2:W1/W2 (numbers, true/false or undefined) into a distribution."""
+    try:
+        name, spec = text.split("=", 1); kind, *args = spec.split(":")
+        if kind == "bool": return name, ("bool", float(args[0]))
+        if kind == "uniform": return name, ("uniform", float(args[0]), float(args[1]))
+        if kind == "choice": return name, ("choice", tuple(_parse_value(v) for v in args[0].split("/")), tuple(float(w) for w in args[1].split("/")))
+    except (ValueError, IndexError): pass
+    raise argparse.ArgumentTypeError(f"Invalid property distribution '{text}'.")
+
+def _parse_value(text):
+    lowered = text.lower()
+    if lowered in ("true", "false"): return lowered == "true"
+    if lowered == "undefined": return None
+    return float(text)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark SceneLinter Pro rule evaluation against a simulated scene.")
+    parser.add_argument("--suite", nargs="+", choices=("default", "cookbook"), default=["default", "cookbook"], help="Rule suites to run (default: all).")
+    parser.add_argument("--rules", default=DEFAULT_RULES_PATH, help="Rules file for the 'default' suite (default: default_rules.json).")
+    parser.add_argument("--cookbook", default=COOKBOOK_RULES_PATH, help="Rules file for the 'cookbook' suite (default: cookbook_rules.json).")
+    parser.add_argument("--nodes", nargs="+", type=int, default=list(DEFAULT_SIZES), help="Scene sizes to run (default: 1000 100000 1000000).")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per scene; the first also defines the rule functions (default: 3).")
+    parser.add_argument("--latency-ms", type=float, default=DEFAULT_LATENCY_MS, help=f"Simulated cost of each bridge call (default: {DEFAULT_LATENCY_MS}).")
+    parser.add_argument("--marshal-us", type=float, default=DEFAULT_MARSHAL_US, help=f"Simulated cost per value returned to Python (default: {DEFAULT_MARSHAL_US}).")
+    parser.add_argument("--property", action="append", type=parse_property, default=[], metavar="NAME=DIST", help="Override a node property distribution, e.g. renderable=bool:0.9. Repeatable.")
+    parser.add_argument("--seed", type=int, default=1, help="Scene generation seed (default: 1).")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="Baseline file to compare against (default: benchmark_baseline.json).")
+    parser.add_argument("--save-baseline", action="store_true", help="Write these results to the baseline file instead of comparing.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help=f"Allowed slowdown/memory growth as a fraction (default: {DEFAULT_TOLERANCE}).")
+    parser.add_argument("-o", "--output", help="Also write the results as JSON to this file.")
+    args = parser.parse_args(argv)
+    suites = load_suites(args.rules, args.cookbook); properties = dict(args.property); baseline = {} if args.save_baseline else read_baseline(args.baseline)
+    results = {}; regressions = 0
+    print(f"{'suite':<10} {'nodes':>9} {'rules':>5} {'rules/sec':>11} {'first ms':>10} {'median ms':>10} {'bridge ms':>10} {'calls':>7} {'peak MB':>9}  vs baseline")
+    for suite in args.suite:
+        for nodes in args.nodes:
+            result = run_benchmark(suites[suite], nodes, args.runs, args.latency_ms, args.marshal_us, properties, args.seed)
+            key = baseline_key(suite, nodes); results[key] = result; problems = compare(result, baseline.get(key), args.tolerance); regressions += 1 if problems else 0
+            verdict = "REGRESSED: " + "; ".join(problems) if problems else (f"{result['rules_per_sec'] / baseline[key]['rules_per_sec']:.2f}x" if key in baseline and baseline[key]["rules_per_sec"] else "-")
+            print(f"{suite:<10} {nodes:>9} {result['rules']:>5} {result['rules_per_sec']:>11.1f} {result['first_run_ms']:>10.1f} {result['median_ms']:>10.1f} {result['bridge_ms']:>10.1f} "
+                  f"{result['first_run_bridge_calls']:>3}/{result['bridge_calls']:<3} {result['peak_mb']:>9.2f}  {verdict}")
+            for error in result["errors"]: print(f"    rule error: {error}", file=sys.stderr)
+    settings = {"runs": args.runs, "latency_ms": args.latency_ms, "marshal_us": args.marshal_us, "seed": args.seed, "properties": args.property}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f: json.dump({"settings": settings, "results": results}, f, indent=4, sort_keys=True)
+    if args.save_baseline:
+        merged = read_baseline(args.baseline); merged.update(results); write_baseline(args.baseline, merged, settings); print(f"Baseline written to {args.baseline}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
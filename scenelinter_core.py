@@ -0,0 +1,588 @@
+#
+#   SceneLinter Pro - Core
+#   Rule loading and evaluation with no Qt dependency. Used by the
+#   3ds Max UI (SceneLinterPro.py) and the batch linter (scenelinter_batch.py).
+#
+#   Author: Iman Shirani
+#
+
+
+import csv
+import hashlib
+import importlib
+import itertools
+import json
+import os
+import re
+import sys
+import time
+import weakref
+from collections.abc import Mapping
+from types import MappingProxyType
+
+# --- CONSTANTS ---
+COLLECTION_CONDITION_TYPES = ("collection_property_all_match", "collection_property_none_match", "collection_count_where", "collection_property_all_in_range")
+DEFAULT_OFFENDER_LIMIT = 100 # Max object names collected per collection rule unless the condition sets "limit"
+MESSAGE_OFFENDER_LIMIT = 10 # Offender names spelled out in a failure message; the rest are only counted
+FIX_UNDO_LABEL = "SceneLinter Pro Fixes"
+
+# --- RUNTIME ---
+def pymxs_runtime():
+    """Default runtime factory: the live 3ds Max runtime. Only importable inside 3ds Max."""
+    from pymxs import runtime
+    return runtime
+
+def resolve_runtime_factory(spec):
+    """Resolves a 'module:callable' spec to a zero-argument factory returning a MaxScript runtime.
+    This is how headless runs swap pymxs.runtime for a stub or simulator."""
+    module_name, _, attr_name = spec.partition(":")
+    if not module_name or not attr_name: raise ValueError(f"Runtime factory '{spec}' must look like 'module:callable'.")
+    return getattr(importlib.import_module(module_name), attr_name)
+
+# --- RULE LOADING ---
+def load_rules(file_path):
+    """Reads a rules file and returns its tree of folder/rule dicts, as shown in the UI tree."""
+    with open(file_path, 'r', encoding='utf-8') as f: data = json.load(f)
+    if not isinstance(data, list): raise ValueError(f"{file_path} does not contain a list of rules and folders.")
+    return data
+
+def collect_enabled_rules(items_data, rules_list=None):
+    """Flattens a rule tree (as stored in the JSON file) into the list of enabled rules, in tree order."""
+    rules_list = [] if rules_list is None else rules_list
+    for item_data in items_data:
+        if not item_data.get("enabled", True): continue
+        if item_data.get("type") == "folder": collect_enabled_rules(item_data.get("children", []), rules_list)
+        else: rules_list.append(item_data)
+    return rules_list
+
+# --- RULE STORE ---
+# Compact in-memory form of a rules file for the UI. Records use __slots__, and identical conditions
+# are shared as one read-only mapping, so large libraries stay small and edits never copy whole dicts.
+RULE_KEYS = ("type", "name", "enabled", "condition", "error_message", "fix_script")
+
+class RuleRecord:
+    """One rule. Supports .get() like the rule dicts in the JSON file, so the evaluator accepts either."""
+    __slots__ = ("name", "enabled", "condition", "error_message", "fix_script", "extra", "parent", "row", "status", "message", "elapsed_ms", "compiled", "result")
+    is_folder = False
+    def __init__(self, name="Unnamed", enabled=True, condition=None, error_message="", fix_script="", extra=None):
+        self.name = name; self.enabled = enabled; self.condition = condition if condition is not None else MappingProxyType({}); self.error_message = error_message; self.fix_script = fix_script
+        self.extra = extra; self.parent = None; self.row = 0; self.status = None; self.message = ""; self.elapsed_ms = None; self.compiled = None; self.result = None
+    def get(self, key, default=None):
+        if key in ("name", "enabled", "condition", "error_message", "fix_script"): return getattr(self, key)
+        if key == "type": return "rule"
+        return self.extra.get(key, default) if self.extra else default
+    def to_dict(self):
+        data = {"type": "rule", "name": self.name, "enabled": self.enabled, "condition": dict(self.condition), "error_message": self.error_message, "fix_script": self.fix_script}
+        if self.extra: data.update(self.extra)
+        return data
+    def path(self):
+        """Returns (folder names..., rule name) from the top of the tree."""
+        path = []; record = self
+        while record is not None and record.parent is not None: path.insert(0, record.name); record = record.parent
+        return tuple(path)
+
+class FolderRecord:
+    __slots__ = ("name", "enabled", "children", "extra", "parent", "row", "elapsed_ms")
+    is_folder = True
+    def __init__(self, name="Unnamed", enabled=True, extra=None):
+        self.name = name; self.enabled = enabled; self.children = []; self.extra = extra; self.parent = None; self.row = 0; self.elapsed_ms = None
+    def to_dict(self):
+        data = {"type": "folder", "name": self.name, "enabled": self.enabled, "children": [child.to_dict() for child in self.children]}
+        if self.extra: data.update(self.extra)
+        return data
+    path = RuleRecord.path
+
+class RuleStore:
+    """Tree of FolderRecord/RuleRecord objects under an unnamed root folder."""
+    def __init__(self): self.root = FolderRecord(""); self._conditions = {}
+    @classmethod
+    def from_data(cls, items_data):
+        store = cls(); store.root.children = [store.record_from_dict(item_data, store.root) for item_data in items_data]; store.renumber(store.root); return store
+    def to_data(self): return [child.to_dict() for child in self.root.children]
+    def intern_condition(self, condition):
+        """Returns a shared read-only copy of `condition`; rules with equal conditions share one object."""
+        key = json.dumps(dict(condition), sort_keys=True, default=str) # JSON text keeps true, 1 and 1.0 apart where a tuple key would not
+        if key not in self._conditions: self._conditions[key] = MappingProxyType(dict(condition))
+        return self._conditions[key]
+    def record_from_dict(self, item_data, parent):
+        extra = {key: value for key, value in item_data.items() if key not in RULE_KEYS and key != "children"} or None
+        if item_data.get("type") == "folder":
+            record = FolderRecord(item_data.get("name", "Unnamed"), item_data.get("enabled", True), extra)
+            record.children = [self.record_from_dict(child_data, record) for child_data in item_data.get("children", [])]; self.renumber(record)
+        else:
+            condition = item_data.get("condition", {}) # a malformed condition loads as empty, so only this rule reports an error
+            record = RuleRecord(item_data.get("name", "Unnamed"), item_data.get("enabled", True), self.intern_condition(condition if isinstance(condition, Mapping) else {}), item_data.get("error_message", ""), item_data.get("fix_script", ""), extra)
+        record.parent = parent; return record
+    def update_rule(self, record, rule_data):
+        """Replaces a rule's fields from an editor dict, keeping its place, status and identity."""
+        record.name = rule_data.get("name", "Unnamed"); record.enabled = rule_data.get("enabled", True); record.condition = self.intern_condition(rule_data.get("condition", {}))
+        record.error_message = rule_data.get("error_message", ""); record.fix_script = rule_data.get("fix_script", ""); record.compiled = None; record.result = None
+    @staticmethod
+    def renumber(folder, start=0):
+        for row in range(start, len(folder.children)): folder.children[row].row = row
+    def insert(self, parent, row, records):
+        for offset, record in enumerate(records): record.parent = parent; parent.children.insert(row + offset, record)
+        self.renumber(parent, row)
+    def remove(self, parent, row, count):
+        del parent.children[row:row + count]; self.renumber(parent, row)
+    def iter_records(self, folder=None):
+        for child in (folder or self.root).children:
+            yield child
+            if child.is_folder: yield from self.iter_records(child)
+    def enabled_rules(self, folder=None):
+        """Enabled rules in tree order, skipping everything inside disabled folders."""
+        rules = []
+        for child in (folder or self.root).children:
+            if not child.enabled: continue
+            if child.is_folder: rules.extend(self.enabled_rules(child))
+            else: rules.append(child)
+        return rules
+    def rule_count(self): return sum(1 for record in self.iter_records() if not record.is_folder)
+
+# --- EVALUATION ---
+def build_batch_expression(expressions):
+    """Builds one MaxScript array expression returning #(ok, value, elapsed_ms) for every target.
+    Each target gets its own try/catch so a rule that throws cannot take down the batch."""
+    entries = [f"(local __slt = timeStamp(); local __slr = try (#(true, ({expression}\n))) catch (#(false, getCurrentException())); append __slr (timeStamp() - __slt); __slr)" for expression in expressions]
+    return "#(\n" + ",\n".join(entries) + "\n)"
+
+def normalize_expression(expression):
+    """Returns the cache key for a MaxScript target: case and repeated blanks are ignored outside string literals."""
+    parts = re.split(r'(@"[^"]*"|"(?:[^"\\]|\\.)*")', expression.strip()) # backslashes do not escape in verbatim @"..." strings
+    return "".join(part if i % 2 else re.sub(r"[ \t]*\n[ \t]*", "\n", re.sub(r"[ \t]+", " ", part)).lower() for i, part in enumerate(parts))
+
+class ExpressionCache:
+    """Memoizes evaluated targets for one lint run, keyed on the normalized expression."""
+    def __init__(self): self._results = {}; self.hits = 0; self.misses = 0
+    def __len__(self): return len(self._results)
+    def lookup(self, key):
+        """Returns True (and counts a hit) if the key was already requested during this run."""
+        if key in self._results: self.hits += 1; return True
+        self.misses += 1; return False
+    def get(self, key): return self._results[key]
+    def store(self, key, result): self._results[key] = result
+    def clear(self): self._results.clear(); self.hits = 0; self.misses = 0
+    def stats(self): return {"hits": self.hits, "misses": self.misses, "entries": len(self._results)}
+
+def _split_condition_args(value_str, count):
+    args = [arg.strip() for arg in str(value_str or "").split(",")]
+    if len(args) != count or not re.match(r"^[A-Za-z_]\w*$", args[0]): raise ValueError(f"Expected '{value_str}' to be {count} comma separated values starting with a property name.")
+    return args
+
+def collection_test(rule_data):
+    """Returns the MaxScript test that is true when the loop variable __slo is an offender of a collection rule."""
+    condition = rule_data.get("condition", {}); cond_type = condition.get("type"); value_str = condition.get("value")
+    if cond_type == "collection_property_all_match": prop, = _split_condition_args(value_str, 1); test = f"(getProperty __slo #{prop}) == false"
+    elif cond_type == "collection_property_none_match": prop, = _split_condition_args(value_str, 1); test = f"(getProperty __slo #{prop}) == true"
+    elif cond_type == "collection_count_where": prop, _ = _split_condition_args(value_str, 2); test = f"(getProperty __slo #{prop}) == true"
+    elif cond_type == "collection_property_all_in_range":
+        prop, min_value, max_value = _split_condition_args(value_str, 3); float(min_value); float(max_value)
+        test = f"(local __slv = getProperty __slo #{prop}; __slv < {min_value} or __slv > {max_value})"
+    else: raise ValueError(f"Unknown collection condition '{cond_type}'.")
+    return test
+
+def build_collection_expression(rule_data, timeout_ms=None):
+    """Builds a MaxScript filter over the rule's collection that returns #(offender_count, #(first offender names), timed_out).
+    The loop runs entirely inside MaxScript, so only the offending names cross the bridge. With a timeout
+    the loop exits once it has run for that long, so one huge collection cannot hang the session.
+    timeout_ms may also name a MaxScript variable holding the limit (0 meaning no limit)."""
+    condition = rule_data.get("condition", {}); test = collection_test(rule_data); limit = condition.get("limit", DEFAULT_OFFENDER_LIMIT)
+    try: limit = int(limit)
+    except (TypeError, ValueError): raise ValueError(f"Invalid offender limit '{limit}'.")
+    if isinstance(timeout_ms, str): deadline = f"if {timeout_ms} > 0 and (timeStamp() - __slstart) > {timeout_ms} do (__slout = true; exit); "
+    else: deadline = f"if (timeStamp() - __slstart) > {int(timeout_ms)} do (__slout = true; exit); " if timeout_ms else ""
+    return (f"(local __sln = 0; local __slnames = #(); local __slout = false; local __slstart = timeStamp(); for __slo in ({condition.get('maxscript_property')}\n) do "
+            f"({deadline}if {test} do (__sln += 1; if __slnames.count < {limit} do append __slnames __slo.name)); #(__sln, __slnames, __slout))")
+
+# --- RULE COMPILATION ---
+# Rules are validated and converted once, when a rules file is loaded: expected values become typed values and
+# each target becomes a MaxScript function that is defined once per session and then only called by name.
+SCALAR_CONDITION_TYPES = ("property_not_empty", "min_value", "max_value", "property_equals")
+COMPILED_CACHE_VERSION = 2
+_session_functions = weakref.WeakKeyDictionary() # runtime -> names of the target functions already defined in that MaxScript session
+_pinned_session_functions = {} # id(runtime) -> (runtime, names), for runtimes that cannot be weakly referenced
+
+def _defined_functions(runtime):
+    # Keyed by the runtime itself: an id() key would let a new runtime inherit a freed one's id and skip its definitions.
+    # Runtimes that cannot be weakly referenced are kept alive by the registry entry, so their id cannot be reused.
+    try: return _session_functions.setdefault(runtime, set())
+    except TypeError: return _pinned_session_functions.setdefault(id(runtime), (runtime, set()))[1]
+
+class CompiledRule:
+    """A validated rule ready for evaluation. `error` is set instead of raising, so a bad rule is reported
+    with the others at load time and simply fails when the rules are run."""
+    __slots__ = ("name", "path", "enabled", "cond_type", "target", "body", "function_name", "offender_query", "expected", "expected_text", "error_message", "fix_script", "error")
+    def __init__(self, **fields):
+        for slot in self.__slots__: setattr(self, slot, fields.get(slot))
+    @property
+    def is_collection(self): return self.cond_type in COLLECTION_CONDITION_TYPES
+    def to_dict(self): return {slot: list(value) if slot == "path" else value for slot, value in ((slot, getattr(self, slot)) for slot in self.__slots__)}
+    @classmethod
+    def from_dict(cls, data): return cls(**dict(data, path=tuple(data.get("path") or ())))
+    def definition(self):
+        """MaxScript that defines the target function. Collection rules take their deadline (ms, 0 for none) as the argument."""
+        return f"fn {self.function_name} __sldeadline = (\n{self.body}\n)"
+    def call(self, timeout_ms=None): return f"{self.function_name} {int(timeout_ms or 0) if self.is_collection else 0}"
+    def check(self, value):
+        """Checks an evaluated target value (the scalar result, or #(offender_count, names, timed_out) for collections) and returns a RuleResult."""
+        error_msg = self.error_message
+        if self.is_collection:
+            count = int(value[0]); names = [str(name) for name in value[1]]
+            if count <= self.expected: return RuleResult(self, True, "Passed", count, names)
+            if self.cond_type == "collection_count_where": return RuleResult(self, False, f"{error_msg} (Count: {count}, Max: {self.expected})", count, names)
+            shown = names[:MESSAGE_OFFENDER_LIMIT]; more = f" (and {count - len(shown)} more)" if count > len(shown) else ""
+            return RuleResult(self, False, f"{error_msg}: {', '.join(shown)}{more}", count, names)
+        if self.cond_type == "property_not_empty":
+            if value is None or str(value).strip() == "": return RuleResult(self, False, error_msg)
+        elif self.cond_type in ("min_value", "max_value"):
+            try: actual = float(value)
+            except (TypeError, ValueError): return RuleResult(self, False, f"Invalid number in {self.cond_type} rule.")
+            if self.cond_type == "min_value" and actual < self.expected: return RuleResult(self, False, f"{error_msg} (Value: {value}, Min: {self.expected_text})")
+            if self.cond_type == "max_value" and actual > self.expected: return RuleResult(self, False, f"{error_msg} (Value: {value}, Max: {self.expected_text})")
+        elif self.cond_type == "property_equals":
+            if str(value).lower() != self.expected: return RuleResult(self, False, f"{error_msg} (Value: {value}, Expected: {self.expected_text})")
+        return RuleResult(self, True, "Passed")
+
+class RuleResult:
+    """Outcome of one rule. Collection rules also carry the offender count and the first offenders' names (up to the
+    rule's "limit"); the full list is read on demand through OffenderSet. Unpacks as (is_valid, message)."""
+    __slots__ = ("rule", "is_valid", "message", "count", "offenders", "timed_out")
+    def __init__(self, rule, is_valid, message, count=None, offenders=None, timed_out=False):
+        self.rule = rule; self.is_valid = is_valid; self.message = message; self.count = count; self.offenders = offenders or []; self.timed_out = timed_out
+    def __iter__(self): return iter((self.is_valid, self.message))
+    @property
+    def has_offenders(self): return bool(self.count) and self.rule is not None and bool(self.rule.offender_query)
+    def to_dict(self):
+        data = {"passed": self.is_valid, "message": self.message}
+        if self.count is not None: data["count"] = self.count; data["offenders"] = self.offenders
+        if self.timed_out: data["timed_out"] = True
+        return data
+
+def target_function_name(body):
+    """Names a target's MaxScript function after its normalized source, so rules with the same target share one function."""
+    return "__sl_" + hashlib.sha1(normalize_expression(body).encode("utf-8")).hexdigest()[:16]
+
+def compile_rule(rule_data, path=(), enabled=True):
+    """Validates one rule dict (or RuleRecord) and returns its CompiledRule."""
+    condition = rule_data.get("condition", {}); malformed = not isinstance(condition, Mapping); condition = {} if malformed else condition
+    cond_type = condition.get("type"); target = condition.get("maxscript_property"); value = condition.get("value")
+    rule = CompiledRule(name=rule_data.get("name", "Unnamed"), path=tuple(path), enabled=enabled, cond_type=cond_type, target=target, expected_text=value,
+                        error_message=rule_data.get("error_message", "A rule failed."), fix_script=rule_data.get("fix_script", ""))
+    try:
+        if malformed: raise ValueError(f"Rule '{rule.name}' has no condition.")
+        if not target: raise ValueError(f"Rule '{rule.name}' has an empty target.")
+        if not isinstance(target, str): raise ValueError(f"Rule '{rule.name}' has a target that is not text.")
+        if value is not None and not isinstance(value, (str, int, float)): raise ValueError(f"Rule '{rule.name}' has a value that is not text or a number.")
+        if cond_type in COLLECTION_CONDITION_TYPES:
+            try:
+                rule.body = build_collection_expression(rule_data, "__sldeadline"); rule.offender_query = f"(for __slo in ({target}\n) where {collection_test(rule_data)} collect __slo)"
+                rule.expected = int(float(_split_condition_args(value, 2)[1])) if cond_type == "collection_count_where" else 0
+            except ValueError as e: raise ValueError(f"Error evaluating collection rule: {e}")
+        elif cond_type in SCALAR_CONDITION_TYPES:
+            rule.body = target
+            if cond_type in ("min_value", "max_value"):
+                try: rule.expected = float(value)
+                except (TypeError, ValueError): raise ValueError(f"Invalid number in {cond_type} rule.")
+            elif cond_type == "property_equals": rule.expected = str(value).lower()
+        else: raise ValueError(f"Rule '{rule.name}' has an unknown condition type '{cond_type}'.")
+        rule.function_name = target_function_name(rule.body)
+    except ValueError as e: rule.error = str(e)
+    return rule
+
+def compiled_rule(rule):
+    """Returns the CompiledRule for a rule dict, RuleRecord or CompiledRule. Records keep theirs until they are edited."""
+    if isinstance(rule, CompiledRule): return rule
+    if isinstance(rule, RuleRecord):
+        if rule.compiled is None: rule.compiled = compile_rule(rule, rule.path(), rule.enabled)
+        return rule.compiled
+    return compile_rule(rule)
+
+class CompiledRuleSet:
+    """Every rule of a rules file (disabled ones included) compiled in tree order."""
+    def __init__(self, rules, content_hash=None): self.rules = rules; self.content_hash = content_hash
+    @classmethod
+    def compile(cls, items_data, content_hash=None):
+        rules = []
+        def walk(items, path, enabled):
+            for item_data in items:
+                item_enabled = enabled and item_data.get("enabled", True); item_path = path + (item_data.get("name", "Unnamed"),)
+                if item_data.get("type") == "folder": walk(item_data.get("children", []), item_path, item_enabled)
+                else: rules.append(compile_rule(item_data, item_path, item_enabled))
+        walk(items_data, (), True); return cls(rules, content_hash)
+    def enabled_rules(self): return [rule for rule in self.rules if rule.enabled]
+    def errors(self): return [rule for rule in self.rules if rule.error]
+    def define_functions(self, runtime):
+        """Defines every target function in the runtime's MaxScript session. Targets MaxScript cannot compile get
+        their error attached to the rule, so syntax errors also surface at load time."""
+        errors = BatchEvaluator(runtime).define_functions(rule for rule in self.rules if not rule.error)
+        for rule in self.rules:
+            if rule.function_name in errors and not rule.error: rule.error = f"Error compiling '{rule.target}': {errors[rule.function_name]}"
+    def to_cache(self): return {"version": COMPILED_CACHE_VERSION, "hash": self.content_hash, "rules": [rule.to_dict() for rule in self.rules]}
+
+def compiled_cache_path(rules_path):
+    root, _ = os.path.splitext(rules_path); return root + ".compiled.json"
+
+def load_compiled_rules(rules_path):
+    """Compiles a rules file, reusing the compiled form cached next to it while the file's content hash is unchanged.
+    A missing, stale or unwritable cache only costs a recompile."""
+    with open(rules_path, 'rb') as f: raw = f.read()
+    content_hash = hashlib.sha256(raw).hexdigest(); cache_path = compiled_cache_path(rules_path)
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f: cached = json.load(f)
+        if cached.get("version") == COMPILED_CACHE_VERSION and cached.get("hash") == content_hash: return CompiledRuleSet([CompiledRule.from_dict(rule) for rule in cached["rules"]], content_hash)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError): pass
+    data = json.loads(raw.decode("utf-8"))
+    if not isinstance(data, list): raise ValueError(f"{rules_path} does not contain a list of rules and folders.")
+    compiled = CompiledRuleSet.compile(data, content_hash)
+    try:
+        with open(cache_path, 'w', encoding='utf-8') as f: json.dump(compiled.to_cache(), f)
+    except OSError as e: print(f"SceneLinter: Could not write compiled rule cache {cache_path}: {e}", file=sys.stderr)
+    return compiled
+
+class BatchEvaluator:
+    """Evaluates a list of rules with a single MaxScript round-trip and checks the results in Python.
+    Rules are compiled first (see compile_rule) and each target is called through its session function.
+    After each call, the last_* lists hold per-rule timing, bridge calls and result size in the same order as the rules,
+    and last_calls holds one {"kind", "start", "wall_ms", "rules"} entry per rt.execute call ("define", "batch" or "single"),
+    listing the indexes of the rules it served."""
+    def __init__(self, runtime=None, cache=None, timeout_ms=None):
+        self.runtime = runtime or pymxs_runtime(); self.cache = ExpressionCache() if cache is None else cache; self.timeout_ms = timeout_ms; self.bridge_calls = 0
+        self.last_elapsed_ms = []; self.last_timed_out = []; self.last_bridge_calls = []; self.last_result_sizes = []; self.last_calls = []
+    def evaluate(self, rules):
+        """Returns one RuleResult per rule, in the same order as `rules`."""
+        results = [None] * len(rules); pending = []; self.last_elapsed_ms = [0.0] * len(rules); self.last_timed_out = [False] * len(rules)
+        self.last_bridge_calls = [0] * len(rules); self.last_result_sizes = [0] * len(rules); self.last_calls = []
+        for index, rule in enumerate(rules):
+            rule = compiled_rule(rule)
+            if rule.error: results[index] = RuleResult(rule, False, rule.error)
+            else: pending.append((index, rule))
+        define_errors = self.define_functions(rule for _, rule in pending)
+        # Every distinct call is evaluated once per run; rules sharing a target reuse the cached result.
+        keys = [rule.call(self.timeout_ms) for _, rule in pending]; to_run = {}
+        for key, (_, rule) in zip(keys, pending):
+            if rule.function_name in define_errors: continue
+            if not self.cache.lookup(key): to_run[key] = None; self.cache.store(key, None)
+        for key, result in zip(to_run, self._execute_batch(list(to_run))): self.cache.store(key, result)
+        charged = set()
+        for key, (index, rule) in zip(keys, pending):
+            if rule.function_name in define_errors: results[index] = RuleResult(rule, False, f"Error evaluating '{rule.target}': {define_errors[rule.function_name]}"); continue
+            ok, value, elapsed = self.cache.get(key)
+            # Only the first rule evaluating an expression is charged its cost; later rules read it from the cache.
+            if key in to_run and key not in charged: self.last_elapsed_ms[index] = float(elapsed); self.last_result_sizes[index] = len(str(value)); charged.add(key)
+            if self.timeout_ms and (elapsed > self.timeout_ms or (ok and rule.is_collection and value[2])):
+                self.last_timed_out[index] = True; results[index] = RuleResult(rule, False, f"Rule '{rule.name}' timed out after {elapsed:.0f} ms (limit: {self.timeout_ms} ms).", timed_out=True); continue
+            if not ok: results[index] = RuleResult(rule, False, f"Error evaluating collection rule: {value}" if rule.is_collection else f"Error evaluating '{rule.target}': {value}")
+            else:
+                try: results[index] = rule.check(value)
+                except Exception as e: results[index] = RuleResult(rule, False, f"Error evaluating collection rule: {e}" if rule.is_collection else f"Error checking '{rule.target}': {e}")
+        # Each call served the rules whose function it defined or whose call it ran
+        for call in self.last_calls:
+            subjects = call.pop("subjects", ()); call["rules"] = [index for key, (index, rule) in zip(keys, pending) if (rule.function_name if call["kind"] == "define" else key) in subjects]
+            for index in call["rules"]: self.last_bridge_calls[index] += 1
+        return results
+    def define_functions(self, rules):
+        """Defines the target functions this session does not have yet, in one call when possible.
+        Returns {function name: error} for the targets MaxScript rejected."""
+        defined = _defined_functions(self.runtime); missing = {}
+        for rule in rules:
+            if rule.function_name not in defined: missing.setdefault(rule.function_name, rule)
+        if not missing: return {}
+        try: self._execute("\n".join(rule.definition() for rule in missing.values()), "define", set(missing)); defined.update(missing); return {}
+        except Exception: pass
+        # One bad target fails the whole definition script, so define them one by one to find it.
+        errors = {}
+        for name, rule in missing.items():
+            try: self._execute(rule.definition(), "define", {name}); defined.add(name)
+            except Exception as e: errors[name] = str(e)
+        return errors
+    def _execute(self, script, kind, subjects):
+        start = time.perf_counter(); self.bridge_calls += 1
+        try: return self.runtime.execute(script)
+        finally: self.last_calls.append({"kind": kind, "start": start, "wall_ms": (time.perf_counter() - start) * 1000.0, "subjects": subjects})
+    def _execute_batch(self, expressions):
+        if not expressions: return []
+        try:
+            batch = self._execute(build_batch_expression(expressions), "batch", set(expressions))
+            return [(bool(entry[0]), entry[1], entry[2]) for entry in batch]
+        except Exception:
+            # If the batch itself cannot run, fall back to evaluating each target on its own to isolate the bad rule.
+            return [self._execute_single(expression) for expression in expressions]
+    def _execute_single(self, expression):
+        # Only reached after a failed batch, so each of these targets is served by two calls
+        start = time.perf_counter()
+        try: return (True, self._execute(expression, "single", {expression}), (time.perf_counter() - start) * 1000.0)
+        except Exception as e: return (False, e, (time.perf_counter() - start) * 1000.0)
+
+# --- OFFENDERS ---
+_offender_ids = itertools.count(1)
+
+def _bitarray_literal(indices):
+    """Formats 1-based indices as a compact MaxScript bitArray literal, e.g. #{1..500, 731}."""
+    ranges = []
+    for index in sorted(set(indices)):
+        if ranges and index == ranges[-1][1] + 1: ranges[-1][1] = index
+        else: ranges.append([index, index])
+    return "#{" + ", ".join(str(first) if first == last else f"{first}..{last}" for first, last in ranges) + "}"
+
+class OffenderSet:
+    """Every offender of a failed collection rule, collected once into a MaxScript global array and read back
+    a page at a time, so even 100k offenders never cross the bridge in one piece. The scene is queried again
+    when the set is created, so the list reflects the scene as it is now. Call release() when done."""
+    def __init__(self, runtime, rule):
+        self.runtime = runtime; self.rule = compiled_rule(rule); self.variable = f"__sloffenders{next(_offender_ids)}"
+        if not self.rule.offender_query: raise ValueError(f"Rule '{self.rule.name}' is not a collection rule.")
+        self.count = int(runtime.execute(f"(global {self.variable} = {self.rule.offender_query}; {self.variable}.count)"))
+    def names(self, start, size):
+        """Names of offenders [start, start + size) (0-based); deleted objects read as "<deleted>"."""
+        first = start + 1; last = min(start + size, self.count)
+        if first > last: return []
+        return [str(name) for name in self.runtime.execute(f"(for __sli in {first} to {last} collect (try ({self.variable}[__sli].name) catch (\"<deleted>\")))")]
+    def iter_names(self, page_size=1000):
+        for start in range(0, self.count, page_size): yield from self.names(start, page_size)
+    def select(self, indices, add=False):
+        """Selects the offenders at the given 0-based indices in the scene (nodes only). Returns how many were selected."""
+        if not indices: return 0
+        command = "selectMore" if add else "select"
+        return int(self.runtime.execute(f"(local __slsel = for __sli in {_bitarray_literal(index + 1 for index in indices)} where __sli <= {self.variable}.count and isValidNode {self.variable}[__sli] collect {self.variable}[__sli]; {command} __slsel; __slsel.count)"))
+    def release(self):
+        try: self.runtime.execute(f"{self.variable} = undefined")
+        except Exception: pass
+
+def export_offenders(offenders, file_path, file_format="csv", page_size=1000):
+    """Streams every name in an OffenderSet to a CSV or JSON file, one page at a time, so the full
+    list is never held in memory. Returns the number of names written."""
+    if file_format not in ("csv", "json"): raise ValueError(f"Unknown export format '{file_format}'.")
+    written = 0
+    with open(file_path, 'w', encoding='utf-8', newline='') as f:
+        if file_format == "csv":
+            writer = csv.writer(f); writer.writerow(["rule", "index", "name"])
+            for written, name in enumerate(offenders.iter_names(page_size), 1): writer.writerow([offenders.rule.name, written, name])
+        else:
+            f.write(f'{{"rule": {json.dumps(offenders.rule.name)}, "count": {offenders.count}, "offenders": [')
+            for name in offenders.iter_names(page_size): f.write((", " if written else "") + json.dumps(name)); written += 1
+            f.write("]}\n")
+    return written
+
+# --- AUTO-FIX ---
+def maxscript_string(text):
+    """Quotes text as a MaxScript string literal."""
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"').replace("\r", "\\r").replace("\n", "\\n").replace("\t", "\\t") + '"'
+
+def build_fix_expression(fix_scripts, undo_label=FIX_UNDO_LABEL):
+    """Builds one MaxScript expression that runs every fix inside a single undo record with scene redraw off and
+    returns #(ok, error, elapsed_ms) per fix. Each fix goes through execute(), so one that does not parse only fails itself."""
+    entries = [f"(local __slt = timeStamp(); local __slr = try (execute {maxscript_string(script)}; #(true, undefined)) catch (#(false, getCurrentException())); append __slr (timeStamp() - __slt); append __slfixes __slr)" for script in fix_scripts]
+    return f"(local __slfixes = #(); undo {maxscript_string(undo_label)} on (with redraw off (\n" + ";\n".join(entries) + "\n)); redrawViews(); __slfixes)"
+
+def apply_fixes(runtime, fix_scripts, undo_label=FIX_UNDO_LABEL):
+    """Runs the distinct, non-empty fix scripts in one bridge call and one undo step.
+    Returns a {"fix_script", "ok", "error", "elapsed_ms"} dict per distinct script, in order."""
+    scripts = list(dict.fromkeys(script for script in fix_scripts if script and script.strip()))
+    if not scripts: return []
+    results = runtime.execute(build_fix_expression(scripts, undo_label))
+    return [{"fix_script": script, "ok": bool(entry[0]), "error": None if entry[0] else str(entry[1]), "elapsed_ms": float(entry[2])} for script, entry in zip(scripts, results)]
+
+# --- PROFILING ---
+class RunProfile:
+    """Per-rule timings for one lint run, with Chrome trace-event export and a rolling history file."""
+    def __init__(self, label="SceneLinter Pro"):
+        self.label = label; self.started = time.time(); self._origin = time.perf_counter(); self.rules = []; self.calls = []
+    def add_batch(self, start, evaluator, rule_paths, statuses):
+        """Records one BatchEvaluator.evaluate() call that began at perf_counter() value `start`.
+        rule_paths holds (folder names..., rule name) tuples in rule order. Rules ran back to back in
+        MaxScript, so they are laid out one after another from the start of the batch. Each rt.execute call
+        the evaluator made is recorded once, with the paths of the rules it served."""
+        rule_paths = [tuple(path) for path in rule_paths]; cursor_us = (start - self._origin) * 1e6
+        for call in evaluator.last_calls:
+            self.calls.append({"kind": call["kind"], "start_us": (call["start"] - self._origin) * 1e6, "wall_ms": call["wall_ms"], "paths": [rule_paths[index] for index in call.get("rules", ())]})
+        for path, status, elapsed_ms, calls, size in zip(rule_paths, statuses, evaluator.last_elapsed_ms, evaluator.last_bridge_calls, evaluator.last_result_sizes):
+            self.rules.append({"path": path, "start_us": cursor_us, "elapsed_ms": elapsed_ms, "bridge_calls": calls, "result_size": size, "status": status}); cursor_us += elapsed_ms * 1000.0
+    def folder_totals(self):
+        """Returns {folder path tuple: {"elapsed_ms", "bridge_calls", "start_us", "end_us"}} aggregated over the rules inside.
+        bridge_calls counts each rt.execute call that served any rule in the folder once."""
+        totals = {}
+        for rule in self.rules:
+            end_us = rule["start_us"] + rule["elapsed_ms"] * 1000.0
+            for depth in range(1, len(rule["path"])):
+                total = totals.setdefault(rule["path"][:depth], {"elapsed_ms": 0.0, "bridge_calls": 0, "start_us": rule["start_us"], "end_us": end_us})
+                total["elapsed_ms"] += rule["elapsed_ms"]; total["end_us"] = max(total["end_us"], end_us)
+        for call in self.calls:
+            for folder in {path[:depth] for path in call["paths"] for depth in range(1, len(path))}:
+                if folder in totals: totals[folder]["bridge_calls"] += 1
+        return totals
+    def slowest(self, count=10): return sorted(self.rules, key=lambda rule: rule["elapsed_ms"], reverse=True)[:count]
+    def to_trace_events(self):
+        events = [{"name": "thread_name", "ph": "M", "pid": 1, "tid": 1, "args": {"name": "Rules"}}, {"name": "thread_name", "ph": "M", "pid": 1, "tid": 2, "args": {"name": "Bridge calls"}}]
+        for path, total in self.folder_totals().items():
+            events.append({"name": path[-1], "cat": "folder", "ph": "X", "pid": 1, "tid": 1, "ts": total["start_us"], "dur": total["end_us"] - total["start_us"], "args": {"elapsed_ms": total["elapsed_ms"], "bridge_calls": total["bridge_calls"]}})
+        for rule in self.rules:
+            events.append({"name": rule["path"][-1], "cat": "rule", "ph": "X", "pid": 1, "tid": 1, "ts": rule["start_us"], "dur": rule["elapsed_ms"] * 1000.0,
+                           "args": {"path": "/".join(rule["path"]), "status": rule["status"], "bridge_calls": rule["bridge_calls"], "result_size": rule["result_size"]}})
+        for call in self.calls: events.append({"name": f"rt.execute ({call['kind']})", "cat": "bridge", "ph": "X", "pid": 1, "tid": 2, "ts": call["start_us"], "dur": call["wall_ms"] * 1000.0, "args": {"rules": len(call["paths"])}})
+        return events
+    def export_chrome_trace(self, file_path):
+        """Writes the run in Chrome trace-event JSON (open it in chrome://tracing or ui.perfetto.dev)."""
+        with open(file_path, 'w', encoding='utf-8') as f: json.dump({"traceEvents": self.to_trace_events(), "displayTimeUnit": "ms", "otherData": {"label": self.label, "started": self.started}}, f)
+    def history_entry(self):
+        return {"started": self.started, "label": self.label, "total_ms": sum(rule["elapsed_ms"] for rule in self.rules), "rules": {"/".join(rule["path"]): round(rule["elapsed_ms"], 3) for rule in self.rules}}
+    def append_to_history(self, file_path, max_runs=50):
+        """Appends this run to a JSON Lines history file, keeping only the newest max_runs entries."""
+        lines = read_history(file_path)[-(max_runs - 1):] if max_runs > 1 else []
+        lines.append(self.history_entry())
+        with open(file_path, 'w', encoding='utf-8') as f: f.writelines(json.dumps(line) + "\n" for line in lines)
+    def find_regressions(self, history, factor=2.0, min_ms=10.0):
+        """Returns (rule path, current ms, median ms) for rules now `factor` times slower than their historical median."""
+        regressions = []
+        for rule in self.rules:
+            key = "/".join(rule["path"]); past = sorted(entry["rules"][key] for entry in history if key in entry.get("rules", {}))
+            if not past: continue
+            median = past[len(past) // 2]
+            if rule["elapsed_ms"] >= min_ms and rule["elapsed_ms"] > median * factor: regressions.append((key, rule["elapsed_ms"], median))
+        return regressions
+
+def read_history(file_path):
+    """Reads a profile history file written by RunProfile.append_to_history; missing or corrupt lines are skipped."""
+    if not os.path.exists(file_path): return []
+    entries = []
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try: entries.append(json.loads(line))
+            except ValueError: continue
+    return entries
+
+# --- LIVE LINT DEPENDENCIES ---
+# Scene change callbacks grouped by the kind of change they report. Rules are only re-checked
+# for the kinds of change their target can observe.
+CHANGE_EVENTS = {
+    "nodes": ("nodeCreated", "nodePostDelete", "nodeRenamed", "nodeHide", "nodeUnhide", "nodeFreeze", "nodeUnfreeze"),
+    "render": ("postRendererChange", "renderPresetsPostLoad"),
+    "materials": ("mtlRefAdded", "mtlRefDeleted"),
+    "selection": ("selectionSetChanged",),
+}
+FULL_RELINT_EVENTS = ("filePostOpen", "systemPostReset", "systemPostNew")
+DEPENDENCY_PATTERNS = {
+    "nodes": re.compile(r"\b(objects|geometry|lights|cameras|shapes|helpers|selection|polycount|getclassinstances|xrefs?|viewport)\b|\$"),
+    "render": re.compile(r"\b(rend\w*|renderers|renderscenedialog|maxops|timeconfiguration)\b"),
+    "materials": re.compile(r"\b(\w*material\w*|\w*mtl\w*|bitmaptexture|getmissingmaps)\b|\.material\b"),
+    # $ is the first selected node, so its rules go stale as soon as the artist selects something else
+    "selection": re.compile(r"\bselection\b|\$"),
+}
+
+def rule_dependencies(rule_data):
+    """Returns the kinds of scene change that can alter a rule's result. Targets that match
+    no known pattern depend on every kind, so they are never left stale."""
+    target = normalize_expression(str(rule_data.get("condition", {}).get("maxscript_property") or ""))
+    kinds = {kind for kind, pattern in DEPENDENCY_PATTERNS.items() if pattern.search(target)}
+    return kinds or set(CHANGE_EVENTS)
+
+# --- SCENE LINTING ---
+def lint_scene(runtime, scene_path, rules):
+    """Opens a scene in the given runtime and evaluates the rules (dicts or CompiledRules) against it. Returns a JSON-ready dict."""
+    start = time.perf_counter(); result = {"scene": scene_path, "passed": False, "error": None, "duration": 0.0, "rules": []}
+    try:
+        if not runtime.loadMaxFile(scene_path, quiet=True): raise RuntimeError("loadMaxFile returned false")
+        evaluator = BatchEvaluator(runtime); rules = [compiled_rule(rule) for rule in rules]
+        for rule, rule_result in zip(rules, evaluator.evaluate(rules)): result["rules"].append(dict({"name": rule.name}, **rule_result.to_dict()))
+        result["passed"] = all(rule["passed"] for rule in result["rules"]); result["bridge_calls"] = evaluator.bridge_calls
+    except Exception as e: result["error"] = f"Could not lint scene: {e}"
+    result["duration"] = round(time.perf_counter() - start, 4); return result
@@ -0,0 +1,509 @@
+#
+#   SceneLinter Pro - Scene Simulator
+#   A stand-in for pymxs.runtime that runs the linter outside 3ds Max.
+#   It holds a synthetic scene (node counts per category, property values
+#   drawn from configurable distributions) and interprets the subset of
+#   MaxScript the linter sends: the generated batch, function, collection
+#   and fix expressions plus typical rule targets. Every execute() call can
+#   be charged a fixed latency and a per-value marshaling cost to model the
+#   pymxs bridge.
+#
+#   Used by scenelinter_bench.py, and by the batch linter via
+#       --runtime scenelinter_sim:make_runtime
+#
+#   Author: Iman Shirani
+#
+
+
+import bisect
+import fnmatch
+import random
+import re
+import time
+
+# --- SCENE CONFIGURATION ---
+# (collection, share of scene nodes, class, superclass). Nodes are laid out in this order, so each collection is one index range.
+NODE_CATEGORIES = (("geometry", 0.85, "Editable_Poly", "GeometryClass"), ("shapes", 0.05, "SplineShape", "Shape"), ("lights", 0.04, "Omnilight", "Light"),
+                   ("cameras", 0.01, "TargetCamera", "Camera"), ("helpers", 0.05, "Dummy", "Helper"))
+MATERIAL_CATEGORIES = (("physical", 0.9, "PhysicalMaterial", "Material"), ("standard", 0.05, "StandardMaterial", "Material"), ("multi", 0.05, "MultiMaterial", "Material"))
+
+class MaxScriptError(RuntimeError):
+    """Raised by execute() for scripts that fail, like the RuntimeError pymxs raises."""
+
+class Name(str):
+    """A MaxScript #name literal; compares case-insensitively."""
+    def __new__(cls, value): return super().__new__(cls, value.lower())
+
+class Point3(tuple):
+    def __new__(cls, x, y, z): return super().__new__(cls, (x, y, z))
+    x = property(lambda self: self[0]); y = property(lambda self: self[1]); z = property(lambda self: self[2])
+
+class SimClass:
+    """A MaxScript class value such as Camera or Dummy. Unknown global names resolve to one of these."""
+    def __init__(self, name): self.name = name
+    def __eq__(self, other): return isinstance(other, SimClass) and other.name.lower() == self.name.lower()
+    def __hash__(self): return hash(self.name.lower())
+    def __str__(self): return self.name
+
+class Namespace:
+    """A struct-like global (renderers, timeConfiguration, maxOps...). Attributes are case-insensitive; callables act as methods."""
+    def __init__(self, **fields): self.fields = {key.lower(): value for key, value in fields.items()}
+
+# Property distributions: ("bool", p_true), ("uniform", low, high) or ("choice", values, weights). Names are case-insensitive.
+DEFAULT_PROPERTIES = {
+    "renderable": ("bool", 0.999), "primaryvisibility": ("bool", 0.999), "secondaryvisibility": ("bool", 0.999), "castshadows": ("bool", 0.99), "receiveshadows": ("bool", 0.99),
+    "isfrozen": ("bool", 0.001), "ishidden": ("bool", 0.02), "on": ("bool", 0.98), "disabled": ("bool", 0.01),
+    "multiplier": ("choice", (1.0, 0.0), (0.995, 0.005)), "blur": ("choice", (1.0, 0.5), (0.99, 0.01)),
+    "scale": ("choice", (Point3(1, 1, 1), Point3(2, 2, 2)), (0.98, 0.02)), "material": ("choice", (SimClass("PhysicalMaterial"), None), (0.99, 0.01)),
+    "fov": ("choice", (Namespace(value=45.0, isAnimated=False), Namespace(value=45.0, isAnimated=True)), (0.95, 0.05)),
+}
+DEFAULT_DISTRIBUTION = ("bool", 0.99)
+DEFAULT_NODE_COUNT = 10000
+
+class Pool:
+    """A set of scene objects of one kind (scene nodes, materials, class instances), stored column-wise.
+    Property columns are only generated the first time a property is read."""
+    def __init__(self, label, size, categories, properties, seed):
+        self.label = label; self.size = size; self.properties = properties; self.seed = seed; self.columns = {}; self.ranges = {}; self.ends = []; self.classes = []; start = 0
+        for index, (category, share, class_name, superclass) in enumerate(categories):
+            end = size if index == len(categories) - 1 else min(size, start + int(round(size * share)))
+            self.ranges[category] = (start, end); self.ends.append(end); self.classes.append((class_name, superclass)); start = end
+    def column(self, prop):
+        column = self.columns.get(prop)
+        if column is None: column = self.columns[prop] = self._generate(prop)
+        return column
+    def _generate(self, prop):
+        kind, *args = self.properties.get(prop, DEFAULT_DISTRIBUTION); rng = random.Random(f"{self.seed}:{self.label}:{prop}")
+        if kind == "bool": return [rng.random() < args[0] for _ in range(self.size)]
+        if kind == "uniform": return [rng.uniform(args[0], args[1]) for _ in range(self.size)]
+        if kind == "choice": return rng.choices(list(args[0]), weights=list(args[1]), k=self.size)
+        raise ValueError(f"Unknown distribution '{kind}' for property '{prop}'.")
+    def class_of(self, index): return self.classes[min(bisect.bisect_right(self.ends, index), len(self.classes) - 1)]
+    def name_of(self, index): return f"{self.label}{index + 1:07d}"
+    def collection(self, category=None):
+        start, end = self.ranges[category] if category else (0, self.size); return Collection(self, start, end)
+
+class Node:
+    """One object of a Pool, created on the fly while iterating."""
+    __slots__ = ("pool", "index")
+    def __init__(self, pool, index): self.pool = pool; self.index = index
+    def __eq__(self, other): return isinstance(other, Node) and other.pool is self.pool and other.index == self.index
+    def __hash__(self): return hash((id(self.pool), self.index))
+    def __str__(self): return f"${self.pool.name_of(self.index)}"
+
+class Collection:
+    """An index range of a Pool, as returned by objects, geometry, getClassInstances..."""
+    __slots__ = ("pool", "start", "end")
+    def __init__(self, pool, start, end): self.pool = pool; self.start = start; self.end = end
+    def __len__(self): return self.end - self.start
+    def __iter__(self):
+        pool = self.pool
+        for index in range(self.start, self.end): yield Node(pool, index)
+    def __getitem__(self, position): return Node(self.pool, self.start + position)
+
+class SimulatedScene:
+    """A synthetic scene: `nodes` scene nodes split across NODE_CATEGORIES, plus material and class-instance pools."""
+    def __init__(self, nodes=DEFAULT_NODE_COUNT, properties=None, seed=1, selected=1):
+        self.node_count = nodes; self.seed = seed; self.properties = dict(DEFAULT_PROPERTIES); self.properties.update({key.lower(): value for key, value in (properties or {}).items()})
+        self.nodes = Pool("Object", nodes, NODE_CATEGORIES, self.properties, seed); self.selected = min(selected, nodes)
+        self.materials = Pool("Material", max(1, nodes // 50), MATERIAL_CATEGORIES, self.properties, seed); self.instance_pools = {}
+        self.globals = {
+            "renderwidth": 1920, "renderheight": 1080, "rendsavefile": True, "rendoutputfilename": "D:/renders/shot_####.exr",
+            "renderers": Namespace(current=SimClass("Arnold")), "timeconfiguration": Namespace(animationRange=Namespace(start=0, end=100)),
+            "renderscenedialog": Namespace(frameType=Name("range")), "units": Namespace(SystemScale=1.0, DisplayType=Name("metric")),
+            "polycount": Namespace(total=nodes * 500), "viewport": Namespace(getCamera=self._active_camera),
+            "maxops": Namespace(GetNumRenderElements=lambda: 0, GetRenderElement=lambda index: None, GetRenderElementMgr=lambda: Namespace(enabled=True), GetRenderOutputFilename=lambda: self.globals["rendoutputfilename"]),
+            "xrefs": Namespace(getXRefFileCount=lambda: 0, getXRefFile=lambda index: Namespace(filename="")),
+        }
+    def collection(self, name):
+        """Returns the scene collection for a MaxScript global name, or None."""
+        if name == "objects": return self.nodes.collection()
+        if name == "selection": return Collection(self.nodes, 0, self.selected)
+        if name == "scenematerials": return self.materials.collection()
+        if name in self.nodes.ranges: return self.nodes.collection(name)
+        return None
+    def class_instances(self, class_name):
+        key = class_name.lower(); pool = self.instance_pools.get(key)
+        if pool is None: pool = self.instance_pools[key] = Pool(class_name, max(1, self.node_count // 100), ((key, 1.0, class_name, "MAXWrapper"),), self.properties, self.seed)
+        return pool.collection()
+    def _active_camera(self):
+        start, end = self.nodes.ranges["cameras"]; return Node(self.nodes, start) if end > start else None
+
+# --- TOKENIZER ---
+TOKEN_PATTERN = re.compile(r"""
+    (?P<comment>--[^\n]*) | (?P<newline>\n) | (?P<space>[ \t\r]+) |
+    (?P<number>\d+\.\d+(?:[eE][-+]?\d+)?|\d+(?:[eE][-+]?\d+)?) |
+    (?P<string>@"[^"]*"|"(?:[^"\\]|\\.)*") |
+    (?P<open>\#\(|\#\{) | (?P<name>\#[A-Za-z_]\w*) |
+    (?P<ident>[A-Za-z_]\w*) |
+    (?P<op>==|!=|<=|>=|\+=|-=|\*=|/=|\.\.|[-+*/<>=()\[\]{},.;:$])
+""", re.VERBOSE)
+STRING_ESCAPES = {"n": "\n", "r": "\r", "t": "\t", '"': '"', "\\": "\\", "%": "%"}
+# Words that end a juxtaposed function call's argument list
+KEYWORDS = {"and", "or", "not", "where", "collect", "do", "then", "else", "catch", "to", "by", "in", "of", "as", "on", "off", "if", "for", "while", "try", "local", "global", "fn", "function", "exit", "undo", "with"}
+
+def tokenize(source):
+    tokens = []; position = 0
+    while position < len(source):
+        match = TOKEN_PATTERN.match(source, position)
+        if not match: raise MaxScriptError(f"-- Syntax error: unexpected '{source[position]}' at offset {position}")
+        kind = match.lastgroup; text = match.group(); position = match.end()
+        if kind in ("comment", "space"): continue
+        if kind == "string": text = text[2:-1] if text.startswith("@") else re.sub(r"\\(.)", lambda m: STRING_ESCAPES.get(m.group(1), m.group(1)), text[1:-1])
+        elif kind == "ident": text = text.lower()
+        tokens.append((kind, text))
+    tokens.append(("eof", "")); return tokens
+
+# --- PARSER / COMPILER ---
+# Scripts are parsed into nested Python closures taking an Env, so a loop body is not re-interpreted per object.
+class _Exit(Exception): pass
+
+class Env:
+    __slots__ = ("vars", "runtime")
+    def __init__(self, runtime, variables=None): self.runtime = runtime; self.vars = variables if variables is not None else {}
+
+class Compiler:
+    def __init__(self, runtime, source): self.runtime = runtime; self.tokens = tokenize(source); self.position = 0
+    # --- token helpers ---
+    def peek(self, offset=0): return self.tokens[min(self.position + offset, len(self.tokens) - 1)]
+    def take(self): token = self.tokens[self.position]; self.position += 1; return token
+    def at(self, text, offset=0): kind, value = self.peek(offset); return kind in ("op", "ident", "open") and value == text
+    def expect(self, text):
+        if not self.at(text): raise MaxScriptError(f"-- Syntax error: expected '{text}', got '{self.peek()[1] or 'end of script'}'")
+        return self.take()
+    def skip_newlines(self):
+        while self.peek()[0] == "newline": self.position += 1
+    def accept(self, text):
+        if self.at(text): self.position += 1; return True
+        return False
+    def starts_operand(self):
+        kind, value = self.peek()
+        if kind in ("number", "string", "name", "open"): return True
+        if kind == "ident": return value not in KEYWORDS and not self.at(":", 1)
+        return kind == "op" and value in ("(", "$")
+    # --- grammar ---
+    def compile_program(self):
+        body = self.sequence("eof"); return body
+    def sequence(self, end):
+        exprs = []
+        while True:
+            while self.peek()[0] == "newline" or self.at(";"): self.position += 1
+            if (end == "eof" and self.peek()[0] == "eof") or self.at(end): break
+            exprs.append(self.expr())
+        if end != "eof": self.expect(end)
+        if not exprs: return lambda env: None
+        if len(exprs) == 1: return exprs[0]
+        def run(env):
+            result = None
+            for expr in exprs: result = expr(env)
+            return result
+        return run
+    def expr(self):
+        self.skip_newlines(); kind, value = self.peek()
+        if kind == "ident":
+            handler = getattr(self, f"_kw_{value}", None)
+            if handler and value in KEYWORDS: self.take(); return handler()
+        target = self.or_expr()
+        for op in ("=", "+=", "-=", "*=", "/="):
+            if self.at(op): self.take(); return self.assignment(target, op, self.expr())
+        return target
+    def _kw_if(self):
+        condition = self.expr(); self.skip_newlines()
+        if self.accept("do"): body = self.expr(); return lambda env: body(env) if condition(env) else None
+        self.expect("then"); then = self.expr()
+        if self.peek()[0] == "newline" and self.at("else", 1): self.skip_newlines()
+        other = self.expr() if self.accept("else") else (lambda env: None)
+        return lambda env: then(env) if condition(env) else other(env)
+    def _kw_try(self):
+        body = self.expr(); self.skip_newlines(); self.expect("catch"); handler = self.expr(); runtime = self.runtime
+        def run(env):
+            try: return body(env)
+            except _Exit: raise
+            except Exception as e: runtime.last_exception = f"-- {type(e).__name__}: {e}" if not isinstance(e, MaxScriptError) else str(e); return handler(env)
+        return run
+    def _kw_local(self): return self._declare(local=True)
+    def _kw_global(self): return self._declare(local=False)
+    def _declare(self, local):
+        name = self.take()[1]; value = self.expr() if self.accept("=") else (lambda env: None)
+        def run(env):
+            result = value(env)
+            if local: env.vars[name] = result
+            else: env.runtime.globals[name] = result
+            return result
+        return run
+    def _kw_exit(self):
+        def run(env): raise _Exit()
+        return run
+    def _kw_fn(self):
+        name = self.take()[1]; params = []
+        while not self.at("="): params.append(self.take()[1])
+        self.expect("="); body = self.expr()
+        def call(*args, **kwargs):
+            env = Env(self.runtime, dict(zip(params, args))); env.vars.update(kwargs); return body(env)
+        def run(env): env.runtime.globals[name] = call; return call
+        return run
+    _kw_function = _kw_fn
+    def _kw_undo(self):
+        if self.peek()[0] == "string": self.take()
+        self.take(); return self.expr() # on/off/true/false - undo records are not simulated
+    def _kw_with(self):
+        while not self.at("("): self.take() # with redraw off / with undo on: contexts are accepted and ignored
+        return self.expr()
+    def _kw_for(self):
+        var = self.take()[1]
+        if not (self.accept("=") or self.accept("in") or self.accept("of")): raise MaxScriptError("-- Syntax error: expected 'in' or '=' in for loop")
+        source = self.or_expr()
+        if self.accept("to"): # for i = 1 to n / for i in 1 to n
+            first = source; last = self.or_expr(); step = self.or_expr() if self.accept("by") else (lambda env: 1)
+            source = lambda env: range(int(first(env)), int(last(env)) + 1, int(step(env)))
+        self.skip_newlines(); condition = self.or_expr() if self.accept("where") else None; self.skip_newlines()
+        collect = self.accept("collect")
+        if not collect: self.expect("do")
+        body = self.expr()
+        def run(env):
+            items = source(env); variables = env.vars; results = [] if collect else None
+            try:
+                for item in items:
+                    variables[var] = item
+                    if condition is not None and not condition(env): continue
+                    value = body(env)
+                    if collect: results.append(value)
+            except _Exit: pass
+            return results
+        return run
+    def _kw_while(self):
+        condition = self.expr(); self.skip_newlines(); self.expect("do"); body = self.expr()
+        def run(env):
+            try:
+                while condition(env): body(env)
+            except _Exit: pass
+        return run
+    def assignment(self, target, op, value):
+        setter = getattr(target, "setter", None)
+        if setter is None: raise MaxScriptError("-- Syntax error: cannot assign to this expression")
+        if op == "=": return lambda env: setter(env, value(env))
+        combine = {"+=": lambda a, b: a + b, "-=": lambda a, b: a - b, "*=": lambda a, b: a * b, "/=": lambda a, b: a / b}[op]
+        return lambda env: setter(env, combine(target(env), value(env)))
+    def or_expr(self):
+        left = self.and_expr()
+        while self.accept("or"):
+            self.skip_newlines(); right = self.and_expr(); left = (lambda a, b: lambda env: bool(a(env)) or bool(b(env)))(left, right)
+        return left
+    def and_expr(self):
+        left = self.not_expr()
+        while self.accept("and"):
+            self.skip_newlines(); right = self.not_expr(); left = (lambda a, b: lambda env: bool(a(env)) and bool(b(env)))(left, right)
+        return left
+    def not_expr(self):
+        if self.accept("not"): operand = self.not_expr(); return lambda env: not operand(env)
+        return self.comparison()
+    def comparison(self):
+        left = self.additive()
+        for op, compare in (("==", _equals), ("!=", lambda a, b: not _equals(a, b)), ("<=", lambda a, b: a <= b), (">=", lambda a, b: a >= b), ("<", lambda a, b: a < b), (">", lambda a, b: a > b)):
+            if self.accept(op): self.skip_newlines(); right = self.additive(); return lambda env: compare(left(env), right(env))
+        return left
+    def additive(self):
+        left = self.multiplicative()
+        while self.at("+") or self.at("-"):
+            op = self.take()[1]; self.skip_newlines(); right = self.multiplicative()
+            left = (lambda a, b: lambda env: a(env) + b(env))(left, right) if op == "+" else (lambda a, b: lambda env: a(env) - b(env))(left, right)
+        return left
+    def multiplicative(self):
+        left = self.unary()
+        while self.at("*") or self.at("/"):
+            op = self.take()[1]; self.skip_newlines(); right = self.unary()
+            left = (lambda a, b: lambda env: a(env) * b(env))(left, right) if op == "*" else (lambda a, b: lambda env: a(env) / b(env))(left, right)
+        return left
+    def unary(self):
+        if self.accept("-"): operand = self.unary(); return lambda env: -operand(env)
+        value = self.call()
+        if self.accept("as"):
+            class_name = self.take()[1]; convert = {"string": _to_string, "integer": lambda v: int(v), "float": lambda v: float(v), "name": lambda v: Name(str(v))}.get(class_name, lambda v: v)
+            return lambda env: convert(value(env))
+        return value
+    def call(self):
+        function = self.postfix(); args = []; kwargs = {}
+        while self.starts_operand() or (self.peek()[0] == "ident" and self.at(":", 1)):
+            if self.peek()[0] == "ident" and self.at(":", 1): key = self.take()[1]; self.take(); kwargs[key] = self.postfix()
+            else: args.append(self.postfix())
+        if not args and not kwargs: return function
+        return lambda env: _call(function(env), [arg(env) for arg in args], {key: arg(env) for key, arg in kwargs.items()})
+    def postfix(self):
+        value = self.primary()
+        while True:
+            if self.at("."):
+                self.take(); name = self.take()[1]; value = _attribute(value, name)
+            elif self.at("(") and self.at(")", 1):
+                self.position += 2; value = (lambda f: lambda env: _call(f(env), [], {}))(value)
+            elif self.at("["):
+                self.take(); index = self.expr(); self.expect("]"); value = _index(value, index)
+            else: return value
+    def primary(self):
+        self.skip_newlines(); kind, value = self.take()
+        if kind == "number": number = float(value) if ("." in value or "e" in value.lower()) else int(value); return lambda env: number
+        if kind == "string": return lambda env: value
+        if kind == "name": name = Name(value[1:]); return lambda env: name
+        if kind == "open" and value == "#(":
+            items = self.items(")"); return lambda env: [item(env) for item in items]
+        if kind == "open" and value == "#{":
+            return self.bitarray()
+        if kind == "op" and value == "(": return self.sequence(")")
+        if kind == "op" and value == "[":
+            items = self.items("]")
+            if len(items) == 3: return lambda env: Point3(*(item(env) for item in items))
+            return lambda env: [item(env) for item in items]
+        if kind == "op" and value == "$":
+            return lambda env: Node(env.runtime.scene.nodes, 0) if env.runtime.scene.selected else None
+        if kind == "ident":
+            if value in ("true", "on"): return lambda env: True
+            if value in ("false", "off"): return lambda env: False
+            if value in ("undefined", "ok"): return lambda env: None
+            if value in KEYWORDS: self.position -= 1; return self.expr()
+            return _variable(value)
+        raise MaxScriptError(f"-- Syntax error: unexpected '{value or 'end of script'}'")
+    def items(self, end):
+        items = []; self.skip_newlines()
+        while not self.at(end):
+            items.append(self.expr()); self.skip_newlines()
+            if not self.accept(","): break
+            self.skip_newlines()
+        self.skip_newlines(); self.expect(end); return items
+    def bitarray(self):
+        ranges = []
+        while not self.at("}"):
+            first = int(self.take()[1]); last = int(self.take()[1]) if self.accept("..") else first; ranges.append((first, last)); self.accept(",")
+        self.expect("}"); return lambda env: [index for first, last in ranges for index in range(first, last + 1)]
+
+# --- VALUE SEMANTICS ---
+def _equals(a, b):
+    if isinstance(a, str) and isinstance(b, str) and (isinstance(a, Name) or isinstance(b, Name)): return a.lower() == b.lower()
+    return a == b
+
+def _to_string(value):
+    if value is None: return "undefined"
+    if value is True: return "true"
+    if value is False: return "false"
+    return str(value)
+
+def _variable(name):
+    def get(env):
+        variables = env.vars
+        if name in variables: return variables[name]
+        return env.runtime.lookup(name)
+    def set_value(env, value):
+        if name in env.vars: env.vars[name] = value
+        else: env.runtime.globals[name] = value
+        return value
+    get.setter = set_value; return get
+
+def get_attribute(value, name):
+    if isinstance(value, Node):
+        if name == "name": return value.pool.name_of(value.index)
+        return value.pool.column(name)[value.index]
+    if name == "count" and isinstance(value, (list, Collection, str)): return len(value)
+    if isinstance(value, Namespace):
+        if name in value.fields: return value.fields[name]
+    elif isinstance(value, Point3) and name in ("x", "y", "z"): return value["xyz".index(name)]
+    raise MaxScriptError(f"-- Unknown property: \"{name}\" in {_to_string(value)}")
+
+def _attribute(target, name):
+    def get(env): return get_attribute(target(env), name)
+    def set_value(env, value):
+        owner = target(env)
+        if isinstance(owner, Node): owner.pool.column(name)[owner.index] = value
+        elif isinstance(owner, Namespace): owner.fields[name] = value
+        else: raise MaxScriptError(f"-- Unknown property: \"{name}\" in {_to_string(owner)}")
+        return value
+    get.setter = set_value; return get
+
+def _index(target, index):
+    def get(env):
+        container = target(env); position = index(env)
+        if isinstance(container, (list, Collection)):
+            if not 1 <= position <= len(container): raise MaxScriptError(f"-- Runtime error: array index out of bounds: {position}")
+            return container[position - 1]
+        raise MaxScriptError(f"-- Unable to index {_to_string(container)}")
+    def set_value(env, value):
+        container = target(env); position = index(env)
+        while len(container) < position: container.append(None)
+        container[position - 1] = value; return value
+    get.setter = set_value; return get
+
+def _call(function, args, kwargs):
+    if not callable(function): raise MaxScriptError(f"-- Type error: Call needs function or class, got: {_to_string(function)}")
+    return function(*args, **kwargs)
+
+def _is_kind_of(value, class_value):
+    class_name = str(class_value).lower()
+    if isinstance(value, Node): return class_name in (name.lower() for name in value.pool.class_of(value.index))
+    return False
+
+# --- RUNTIME ---
+class SimulatedRuntime:
+    """Drop-in for pymxs.runtime in the linter: execute() runs MaxScript against a SimulatedScene.
+    latency_ms is charged once per call and marshal_us per value returned, by busy-waiting so sub-millisecond costs are exact.
+    Counters: bridge_calls, bridge_seconds (time spent inside execute) and values_marshaled."""
+    def __init__(self, scene=None, latency_ms=0.0, marshal_us=0.0):
+        self.scene = scene or SimulatedScene(); self.seed = self.scene.seed; self.latency_ms = latency_ms; self.marshal_us = marshal_us; self.globals = {}; self.last_exception = None
+        self.bridge_calls = 0; self.bridge_seconds = 0.0; self.values_marshaled = 0
+        self.builtins = {
+            "timestamp": lambda: int(time.perf_counter() * 1000), "getcurrentexception": lambda: self.last_exception,
+            "append": _append, "getproperty": get_attribute, "isproperty": lambda value, name: isinstance(value, Node),
+            "iskindof": _is_kind_of, "classof": lambda value: SimClass(value.pool.class_of(value.index)[0]) if isinstance(value, Node) else SimClass(type(value).__name__),
+            "matchpattern": lambda text, pattern="*", ignoreCase=True: fnmatch.fnmatchcase(str(text).lower(), str(pattern).lower()),
+            "doesfileexist": lambda path: True, "getclassinstances": lambda class_value: self.scene.class_instances(str(class_value)),
+            "getmissingmaps": lambda: [], "numatmospherics": lambda: 0, "execute": self._run,
+            "isvalidnode": lambda value: isinstance(value, Node) and value.pool is self.scene.nodes, "isdeleted": lambda value: False,
+            "select": self._select, "selectmore": self._select, "clearselection": lambda: None, "redrawviews": lambda: None, "completeredraw": lambda: None,
+        }
+    def lookup(self, name):
+        if name in self.globals: return self.globals[name]
+        if name in self.builtins: return self.builtins[name]
+        if name in self.scene.globals: return self.scene.globals[name]
+        collection = self.scene.collection(name)
+        return collection if collection is not None else SimClass(name)
+    def __getattr__(self, name):
+        # pymxs exposes MaxScript globals as attributes (rt.name, rt.callbacks...); the linter only needs a few
+        if name.startswith("__"): raise AttributeError(name)
+        if name == "name": return Name
+        value = self.lookup(name.lower())
+        if isinstance(value, SimClass): raise AttributeError(name)
+        return value
+    def execute(self, script):
+        start = time.perf_counter(); self.bridge_calls += 1
+        try:
+            result = self._run(script)
+            values = _marshal_count(result); self.values_marshaled += values
+            _spin(start, self.latency_ms / 1000.0 + values * self.marshal_us / 1e6)
+            return _to_python(result)
+        finally: self.bridge_seconds += time.perf_counter() - start
+    def _run(self, script):
+        try: return Compiler(self, script).compile_program()(Env(self))
+        except (MaxScriptError, _Exit): raise
+        except Exception as e: raise MaxScriptError(f"-- {type(e).__name__}: {e}") from e
+    def loadMaxFile(self, path, quiet=False):
+        """Simulates opening a scene: the scene is regenerated with a seed derived from the path. MaxScript globals and functions survive, as in 3ds Max."""
+        self.scene = SimulatedScene(self.scene.node_count, self.scene.properties, seed=f"{self.seed}:{path}", selected=self.scene.selected); return True
+    def _select(self, value):
+        items = value if isinstance(value, (list, Collection)) else [value]
+        self.scene.selected = sum(1 for item in items if isinstance(item, Node)); return None
+
+def _append(array, value): array.append(value); return array
+
+def _marshal_count(value):
+    if isinstance(value, list): return 1 + sum(_marshal_count(item) for item in value)
+    return 1
+
+def _to_python(value):
+    # pymxs hands back MaxScript arrays as sequences and nodes/classes as wrapper objects; plain lists and objects are close enough
+    if isinstance(value, list): return [_to_python(item) for item in value]
+    return value
+
+def _spin(start, seconds):
+    if seconds <= 0: return
+    deadline = start + seconds
+    while time.perf_counter() < deadline: pass
+
+def make_runtime():
+    """Runtime factory for --runtime scenelinter_sim:make_runtime (a DEFAULT_NODE_COUNT node scene, no bridge latency)."""
+    return SimulatedRuntime()
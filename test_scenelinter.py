@@ -0,0 +1,153 @@
+#
+#   SceneLinter Pro - Tests
+#   Drives the core and the batch linter against the scene simulator, so
+#   they run anywhere with pytest:  python -m pytest -q
+#
+
+
+import csv
+import json
+import os
+import shutil
+import time
+import xml.etree.ElementTree as ElementTree
+import pytest
+import scenelinter_batch
+from scenelinter_core import (BatchEvaluator, ExpressionCache, OffenderSet, RuleStore, RunProfile, _bitarray_literal, apply_fixes, compile_rule, compiled_cache_path,
+                              export_offenders, load_compiled_rules, normalize_expression, rule_dependencies)
+from scenelinter_sim import SimulatedRuntime, SimulatedScene
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "default_rules.json")
+
+def rule(name, cond_type, target, value="", fix_script=""):
+    return {"type": "rule", "name": name, "enabled": True, "condition": {"type": cond_type, "maxscript_property": target, "value": value}, "error_message": f"{name} failed", "fix_script": fix_script}
+
+@pytest.fixture
+def runtime():
+    # Half the geometry is not renderable, so collection rules always have offenders to page through
+    return SimulatedRuntime(SimulatedScene(2000, properties={"renderable": ("bool", 0.5)}))
+
+@pytest.fixture
+def rules_file(tmp_path):
+    path = tmp_path / "rules.json"
+    shutil.copy(DEFAULT_RULES_PATH, path); return path
+
+# --- EXPRESSIONS AND COMPILATION ---
+def test_normalize_expression_ignores_case_and_blanks_outside_strings():
+    assert normalize_expression('  Lights.Count  ==   "Key  Light" ') == 'lights.count == "Key  Light"'
+    assert normalize_expression("a \t\n  b") == "a\nb"
+
+def test_normalize_expression_keeps_strings_after_a_verbatim_path():
+    assert normalize_expression('rendOutputFilename == @"D:\\" + "ABC"') == 'rendoutputfilename == @"D:\\" + "ABC"'
+    assert normalize_expression('A == @"D:\\" + "ABC"') != normalize_expression('A == @"D:\\" + "abc"')
+
+def test_bitarray_literal_merges_runs():
+    assert _bitarray_literal([5, 1, 2, 3, 3, 7]) == "#{1..3, 5, 7}"
+
+def with_condition(data, **fields):
+    data["condition"] = dict(data["condition"], **fields); return data
+
+@pytest.mark.parametrize("data", [rule("Empty", "min_value", ""), rule("Bad number", "min_value", "renderWidth", "wide"), rule("Unknown type", "no_such_type", "renderWidth", "1"),
+                                  with_condition(rule("No limit", "collection_property_all_match", "geometry", "renderable"), limit=None), rule("Numeric target", "min_value", 5, "1"),
+                                  dict(rule("No condition", "min_value", "renderWidth", "1"), condition=None), rule("List value", "property_equals", "renderWidth", ["1920"])])
+def test_compile_rule_reports_bad_rules_instead_of_raising(data):
+    assert compile_rule(data).error
+
+def test_bad_rules_do_not_stop_a_file_from_loading(tmp_path):
+    path = tmp_path / "rules.json"; data = [rule("Good", "min_value", "renderWidth", "1"), rule("Numeric target", "min_value", 5, "1"), dict(rule("No condition", "min_value", "renderWidth", "1"), condition=None)]
+    path.write_text(json.dumps(data), encoding="utf-8")
+    assert [bool(compiled.error) for compiled in load_compiled_rules(str(path)).rules] == [False, True, True]
+    assert len(RuleStore.from_data(data).root.children) == 3
+
+def test_compile_rule_shares_functions_between_equivalent_targets():
+    assert compile_rule(rule("a", "min_value", "renderWidth", "1")).function_name == compile_rule(rule("b", "max_value", "  RENDERWIDTH ", "9000")).function_name
+
+def test_compiled_cache_is_reused_until_the_rules_change(rules_file):
+    first = load_compiled_rules(rules_file); cache_path = compiled_cache_path(str(rules_file))
+    # Mark the cache so a hit is visible, then check a content change invalidates it
+    cached = json.loads(open(cache_path, encoding="utf-8").read()); cached["rules"][0]["name"] = "From cache"
+    with open(cache_path, "w", encoding="utf-8") as f: json.dump(cached, f)
+    assert load_compiled_rules(rules_file).to_cache()["rules"][0]["name"] == "From cache"
+    rules_file.write_bytes(rules_file.read_bytes() + b"\n")
+    assert load_compiled_rules(rules_file).to_cache()["rules"][0]["name"] == first.to_cache()["rules"][0]["name"]
+
+def test_rule_store_keeps_equal_but_differently_typed_values_apart():
+    data = [rule("Bool", "property_equals", "renderSaveFile", True), rule("Int", "property_equals", "renderSaveFile", 1), rule("Float", "property_equals", "renderSaveFile", 1.0)]
+    assert json.dumps(RuleStore.from_data(data).to_data()) == json.dumps(data)
+
+# --- EVALUATION ---
+def test_default_rules_evaluate_in_two_bridge_calls(rules_file, runtime):
+    rules = load_compiled_rules(rules_file).enabled_rules(); evaluator = BatchEvaluator(runtime)
+    results = evaluator.evaluate(rules)
+    assert len(results) == len(rules) and not any(result.message.startswith("Error") for result in results)
+    assert evaluator.bridge_calls == 2 and [call["kind"] for call in evaluator.last_calls] == ["define", "batch"]
+    # Functions stay defined for the session, so the next run is one call
+    evaluator = BatchEvaluator(runtime); evaluator.evaluate(rules); assert evaluator.bridge_calls == 1
+
+def test_equivalent_targets_are_evaluated_once(runtime):
+    cache = ExpressionCache(); rules = [rule("Width", "min_value", "renderWidth", "1280"), rule("Width again", "max_value", "RenderWidth ", "4096")]
+    results = BatchEvaluator(runtime, cache).evaluate(rules)
+    assert all(result.is_valid for result in results) and cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+def test_bad_rules_fail_alone(runtime):
+    rules = [rule("Good", "min_value", "renderWidth", "1280"), rule("Syntax", "min_value", "renderWidth +", "1"), rule("Runtime", "property_equals", "undefined.count", "1"), rule("Also good", "property_equals", "lights.count > 0", "True")]
+    results = BatchEvaluator(runtime).evaluate(rules)
+    assert [result.is_valid for result in results] == [True, False, False, True]
+    assert results[1].message.startswith("Error") and results[2].message.startswith("Error")
+
+def test_slow_rules_time_out():
+    runtime = SimulatedRuntime(SimulatedScene(200000)); evaluator = BatchEvaluator(runtime, timeout_ms=1)
+    results = evaluator.evaluate([rule("Scan", "collection_property_all_match", "objects", "renderable"), rule("Count", "max_value", "(for o in objects where o.isHidden collect o).count", "100000")])
+    assert all(result.timed_out for result in results) and all(evaluator.last_timed_out)
+
+def test_collection_rule_reports_offenders(runtime):
+    result = BatchEvaluator(runtime).evaluate([rule("Renderable", "collection_property_all_match", "geometry", "renderable")])[0]
+    assert not result.is_valid and result.has_offenders and result.count > len(result.offenders) > 0
+
+def test_selection_rules_depend_on_selection_changes():
+    assert "selection" in rule_dependencies(rule("Selected", "property_equals", "$.renderable", "True"))
+
+def test_profile_counts_each_bridge_call_once_per_folder(rules_file, runtime):
+    rules = load_compiled_rules(rules_file).enabled_rules(); evaluator = BatchEvaluator(runtime); profile = RunProfile(); start = time.perf_counter()
+    statuses = ["Passed" for _ in evaluator.evaluate(rules)]; profile.add_batch(start, evaluator, [record.path for record in rules], statuses)
+    assert len(profile.calls) == 2 and all(total["bridge_calls"] == 2 for total in profile.folder_totals().values())
+
+# --- OFFENDERS AND FIXES ---
+def test_offender_set_pages_selects_and_exports(runtime, tmp_path):
+    data = rule("Renderable", "collection_property_all_match", "geometry", "renderable"); expected = BatchEvaluator(runtime).evaluate([data])[0].count
+    offenders = OffenderSet(runtime, data)
+    try:
+        assert offenders.count == expected
+        names = list(offenders.iter_names(page_size=97))
+        assert len(names) == expected and names[:10] == offenders.names(0, 10) and offenders.names(expected, 10) == []
+        assert offenders.select([0, 1, 2, expected + 5]) == 3
+        export_offenders(offenders, tmp_path / "offenders.csv", "csv", page_size=50); export_offenders(offenders, tmp_path / "offenders.json", "json", page_size=50)
+        rows = list(csv.reader(open(tmp_path / "offenders.csv", encoding="utf-8")))
+        assert rows[0] == ["rule", "index", "name"] and [row[2] for row in rows[1:]] == names
+        assert json.load(open(tmp_path / "offenders.json", encoding="utf-8"))["offenders"] == names
+    finally: offenders.release()
+
+def test_offender_set_needs_a_collection_rule(runtime):
+    with pytest.raises(ValueError): OffenderSet(runtime, rule("Width", "min_value", "renderWidth", "1280"))
+
+def test_apply_fixes_runs_distinct_fixes_once_and_isolates_failures(runtime):
+    fix = "for obj in geometry where obj.renderable == false do obj.renderable = true"
+    results = apply_fixes(runtime, [fix, "", fix, "this is not maxscript +", "  "])
+    assert [result["ok"] for result in results] == [True, False] and results[1]["error"]
+    assert BatchEvaluator(runtime).evaluate([rule("Renderable", "collection_property_all_match", "geometry", "renderable")])[0].is_valid
+
+# --- BATCH LINTER ---
+def test_batch_main_writes_jsonl(rules_file, capsys):
+    exit_code = scenelinter_batch.main([str(rules_file), "a.max", "b.max", "-j", "1", "--runtime", "scenelinter_sim:make_runtime"])
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert exit_code == 1 and sorted(line["scene"] for line in lines) == ["a.max", "b.max"] and all(line["error"] is None and line["rules"] for line in lines)
+
+def test_batch_main_writes_junit(rules_file, tmp_path):
+    report = tmp_path / "report.xml"
+    scenelinter_batch.main([str(rules_file), "a.max", "-j", "1", "-f", "junit", "-o", str(report), "--runtime", "scenelinter_sim:make_runtime"])
+    suites = ElementTree.parse(report).getroot().findall("testsuite")
+    assert len(suites) == 1 and len(suites[0].findall("testcase")) == int(suites[0].get("tests"))
+
+def test_batch_main_fails_fast_without_a_runtime(rules_file, capsys):
+    assert scenelinter_batch.main([str(rules_file), "a.max", "-j", "1", "--runtime", "no_such_module:make_runtime"]) == 2
+    captured = capsys.readouterr(); assert captured.out == "" and "Could not create runtime" in captured.err